@@ -0,0 +1,15 @@
+"""
+Root pytest configuration: share one configured dashboard app across the session
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """Dashboard app imported and configured once for all tests"""
+    from orbcomm_dashboard import app
+
+    app.config["TESTING"] = True
+    app.config["DATABASE_PATH"] = ":memory:"
+    return app
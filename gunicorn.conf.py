@@ -5,6 +5,14 @@ Documentation: https://docs.gunicorn.org/en/stable/settings.html
 
 import multiprocessing
 import os
+import shutil
+
+from dotenv import load_dotenv
+
+# Read .env once in the master: the settings below see it, and forked
+# workers inherit the environment instead of re-parsing the file
+load_dotenv()
+os.environ["_DOTENV_LOADED"] = "1"
 
 # Server socket
 bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
@@ -38,12 +46,21 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 # Process naming
 proc_name = "orbcomm-tracker"
 
+# Prometheus multiprocess mode: workers write metrics here and /metrics
+# aggregates them. Must be set before workers import prometheus_client.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/orbcomm-prometheus")
+
 
 # Server hooks
 def on_starting(server):
     """Called just before the master process is initialized."""
     print(f"Starting Gunicorn server with {workers} workers")
 
+    # Drop metric files left behind by a previous run
+    prom_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(prom_dir, ignore_errors=True)
+    os.makedirs(prom_dir, exist_ok=True)
+
 
 def on_reload(server):
     """Called to recycle workers during a reload."""
@@ -65,6 +82,16 @@ def post_fork(server, worker):
     print(f"Worker spawned (pid: {worker.pid})")
 
 
+def child_exit(server, worker):
+    """Called just after a worker has been exited, in the master process."""
+    try:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+    except ImportError:
+        pass
+
+
 def worker_int(worker):
     """Called when a worker receives the INT or QUIT signal."""
     print(f"Worker received INT or QUIT signal (pid: {worker.pid})")
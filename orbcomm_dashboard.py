@@ -87,7 +87,7 @@ def index():
             FROM notifications
             WHERE status = 'Resolved'
         )
-        ORDER BY n.date_received DESC
+        ORDER BY n.date_received_ts DESC
     """
     )
     open_notifications = [dict(row) for row in cursor.fetchall()]
@@ -167,7 +167,7 @@ def notification_detail(notif_id):
         FROM notifications
         WHERE reference_number = ?
         AND status = 'Resolved'
-        ORDER BY date_received DESC
+        ORDER BY date_received_ts DESC
         LIMIT 1
     """,
         (notification["reference_number"],),
@@ -207,7 +207,7 @@ def notification_detail(notif_id):
         SELECT id, status, date_received, time_received
         FROM notifications
         WHERE reference_number = ?
-        ORDER BY date_received, time_received
+        ORDER BY date_received_ts, time_received
     """,
         (notification["reference_number"],),
     )
@@ -279,6 +279,7 @@ def api_sync():
         if request_key and request_key != api_key:
             return jsonify({"success": False, "error": "Unauthorized"}), 401
 
+    sync1 = sync2 = None
     try:
         results = {}
         failed_inboxes = []
@@ -287,7 +288,6 @@ def api_sync():
         try:
             sync1 = SyncOrchestrator(inbox_number=1)
             results["inbox1"] = sync1.sync()
-            sync1.close()
         except Exception as e:
             results["inbox1"] = {"status": "error", "error": str(e)}
             failed_inboxes.append(1)
@@ -296,7 +296,6 @@ def api_sync():
         try:
             sync2 = SyncOrchestrator(inbox_number=2)
             results["inbox2"] = sync2.sync()
-            sync2.close()
         except Exception as e:
             results["inbox2"] = {"status": "error", "error": str(e)}
             failed_inboxes.append(2)
@@ -316,6 +315,13 @@ def api_sync():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+    finally:
+        # Stop each inbox's token refresh; the first close also releases the
+        # thread's shared connection both orchestrators used
+        for sync in (sync1, sync2):
+            if sync is not None:
+                sync.close()
+
 
 @app.route("/api/stats")
 def api_stats():
@@ -340,10 +346,10 @@ def export_csv():
     include_archived = request.args.get("archived", "no") == "yes"
 
     # Get notifications
-    if status_filter != "all":
-        notifs = db.get_notifications_by_status(status_filter, include_archived)
-    else:
-        notifs = db.get_all_notifications(include_archived)
+    notifs = db.get_notification_records(
+        status=None if status_filter == "all" else status_filter,
+        include_archived=include_archived,
+    )
 
     db.close()
 
@@ -364,14 +370,15 @@ def export_csv():
         "time_to_resolve_minutes",
     ]
 
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
-    writer.writeheader()
+    writer = csv.writer(output)
+    writer.writerow(fieldnames)
 
     for notif in notifs:
+        row = [getattr(notif, field) for field in fieldnames]
         # Truncate summary for CSV
-        if notif.get("summary") and len(notif["summary"]) > 200:
-            notif["summary"] = notif["summary"][:197] + "..."
-        writer.writerow(notif)
+        if notif.summary and len(notif.summary) > 200:
+            row[fieldnames.index("summary")] = notif.summary[:197] + "..."
+        writer.writerow(row)
 
     # Prepare response
     output.seek(0)
@@ -10,7 +10,7 @@ import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Union
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +18,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import; parse_text runs for every synced email
+_REFERENCE_RE = re.compile(r"([A-Z]-\d{6})")
+_SCHEDULED_DATE_RES = (
+    re.compile(r"(\w+\s+\d{1,2}(?:st|nd|rd|th)?)"),  # November 5th
+    re.compile(r"(\d{1,2}/\d{1,2}/\d{4})"),  # 11/5/2024
+    re.compile(r"(\d{4}-\d{2}-\d{2})"),  # 2024-11-05
+)
+_SCHEDULED_TIME_RE = re.compile(r"(\d{1,2}:\d{2}\s*(?:UTC|GMT|EST|PST|[AP]M)?)")
+_DURATION_RE = re.compile(
+    r"(?:last|duration|take|approximately)\s+(\d+)\s+(hour|minute|day)s?",
+    re.IGNORECASE,
+)
+# Incident times in resolved emails: <b>Start Time:</b>&nbsp;2025-10-22 15:05 GMT
+_INCIDENT_TIME_RE = re.compile(r"<b>(Start|End) Time:</b>\s*&nbsp;([^<]+)")
+_INCIDENT_TIME_VALUE_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2})(?: GMT)?"
+)
+
+# Normalizes body whitespace in one C-level pass: non-breaking spaces and
+# tabs become spaces, carriage returns are dropped
+_WS_TABLE = str.maketrans({"\xa0": " ", "\r": "", "\t": " "})
+
+
+def _parse_incident_time(value: str) -> datetime:
+    """Parse an incident time like "2025-10-22 15:05 GMT" (raises ValueError)"""
+    match = _INCIDENT_TIME_VALUE_RE.fullmatch(value)
+    if match:
+        # Fixed-width fields: build the datetime directly, skipping strptime
+        return datetime(*map(int, match.groups()))
+    return datetime.strptime(value.replace(" GMT", ""), "%Y-%m-%d %H:%M")
+
+
+def _to_minutes(dt: datetime) -> int:
+    """Whole minutes since 0001-01-01 (incident times have no seconds)"""
+    return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
+
 
 class SimpleORBCOMMParser:
     """Simplified parser for ORBCOMM notifications."""
@@ -26,14 +62,18 @@ class SimpleORBCOMMParser:
         self.data = []
         self.reference_counter = {}
 
-    def parse_text(self, text: str, subject: str = "", email_date: str = None) -> Dict:
+    def parse_text(
+        self, text: Union[str, bytes], subject: str = "", email_date: str = None
+    ) -> Dict:
         """Parse notification text and extract key information.
 
         Args:
-            text: Email body text
+            text: Email body text, or the raw UTF-8 body bytes
             subject: Email subject line
             email_date: Optional email date string (RFC 2822 format from Gmail headers)
         """
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="replace")
 
         # Parse email date if provided
         if email_date:
@@ -76,7 +116,7 @@ class SimpleORBCOMMParser:
         # Extract from subject line if provided
         if subject:
             # Look for reference number
-            ref_match = re.search(r"([A-Z]-\d{6})", subject)
+            ref_match = _REFERENCE_RE.search(subject)
             if ref_match:
                 result["reference_number"] = ref_match.group(1)
 
@@ -100,6 +140,7 @@ class SimpleORBCOMMParser:
                 result["platform"] = "OGWS"
 
         # Parse the body text
+        text = text.translate(_WS_TABLE)
         lines = text.split("\n")
         for line in lines:
             line = line.strip()
@@ -123,31 +164,19 @@ class SimpleORBCOMMParser:
                     summary_text = result["summary"]
 
                     # Look for date patterns (e.g., "November 5th", "Nov 5", "11/5")
-                    date_patterns = [
-                        r"(\w+\s+\d{1,2}(?:st|nd|rd|th)?)",  # November 5th
-                        r"(\d{1,2}/\d{1,2}/\d{4})",  # 11/5/2024
-                        r"(\d{4}-\d{2}-\d{2})",  # 2024-11-05
-                    ]
-
-                    for pattern in date_patterns:
-                        date_match = re.search(pattern, summary_text)
+                    for pattern in _SCHEDULED_DATE_RES:
+                        date_match = pattern.search(summary_text)
                         if date_match:
                             result["scheduled_date"] = date_match.group(1)
                             break
 
                     # Look for time patterns (e.g., "15:00 UTC", "3:00 PM")
-                    time_match = re.search(
-                        r"(\d{1,2}:\d{2}\s*(?:UTC|GMT|EST|PST|[AP]M)?)", summary_text
-                    )
+                    time_match = _SCHEDULED_TIME_RE.search(summary_text)
                     if time_match:
                         result["scheduled_time"] = time_match.group(1)
 
                     # Look for duration
-                    duration_match = re.search(
-                        r"(?:last|duration|take|approximately)\s+(\d+)\s+(hour|minute|day)s?",
-                        summary_text,
-                        re.IGNORECASE,
-                    )
+                    duration_match = _DURATION_RE.search(summary_text)
                     if duration_match:
                         result[
                             "duration"
@@ -175,15 +204,16 @@ class SimpleORBCOMMParser:
         if result["status"] == "Resolved":
             ref_num = result.get("reference_number", "UNKNOWN")
 
-            # Look for Start Time in HTML body
-            start_match = re.search(r"<b>Start Time:</b>\s*&nbsp;([^<]+)", text)
-            if start_match:
-                start_time_str = start_match.group(1).strip()
+            # One scan of the HTML body finds both times (first of each wins)
+            incident_times = {}
+            for label, value in _INCIDENT_TIME_RE.findall(text):
+                incident_times.setdefault(label, value.strip())
+
+            # Start Time
+            if "Start" in incident_times:
+                start_time_str = incident_times["Start"]
                 try:
-                    # Parse format: "2025-10-22 15:05 GMT"
-                    start_dt = datetime.strptime(
-                        start_time_str.replace(" GMT", ""), "%Y-%m-%d %H:%M"
-                    )
+                    start_dt = _parse_incident_time(start_time_str)
                     result["incident_start_time"] = start_dt.strftime(
                         "%Y-%m-%d %H:%M:%S"
                     )
@@ -201,15 +231,11 @@ class SimpleORBCOMMParser:
                     f"[{ref_num}] No incident start time found in resolved notification (older format)"
                 )
 
-            # Look for End Time in HTML body
-            end_match = re.search(r"<b>End Time:</b>\s*&nbsp;([^<]+)", text)
-            if end_match:
-                end_time_str = end_match.group(1).strip()
+            # End Time
+            if "End" in incident_times:
+                end_time_str = incident_times["End"]
                 try:
-                    # Parse format: "2025-10-22 15:05 GMT"
-                    end_dt = datetime.strptime(
-                        end_time_str.replace(" GMT", ""), "%Y-%m-%d %H:%M"
-                    )
+                    end_dt = _parse_incident_time(end_time_str)
                     result["incident_end_time"] = end_dt.strftime("%Y-%m-%d %H:%M:%S")
                     logger.debug(
                         f"[{ref_num}] Parsed incident end time: {result['incident_end_time']}"
@@ -228,16 +254,9 @@ class SimpleORBCOMMParser:
             # Calculate incident duration if both times are available
             if result["incident_start_time"] and result["incident_end_time"]:
                 try:
-                    start_dt = datetime.strptime(
-                        result["incident_start_time"], "%Y-%m-%d %H:%M:%S"
-                    )
-                    end_dt = datetime.strptime(
-                        result["incident_end_time"], "%Y-%m-%d %H:%M:%S"
-                    )
-                    duration_delta = end_dt - start_dt
-                    result["incident_duration_minutes"] = int(
-                        duration_delta.total_seconds() / 60
-                    )
+                    # Integer minute arithmetic on the already-parsed times
+                    minutes = _to_minutes(end_dt) - _to_minutes(start_dt)
+                    result["incident_duration_minutes"] = minutes
                     logger.info(
                         f"[{ref_num}] Calculated incident duration: {result['incident_duration_minutes']} minutes"
                     )
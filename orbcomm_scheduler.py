@@ -12,6 +12,7 @@ from pathlib import Path
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from orbcomm_tracker.database import close_shared_db  # noqa: E402
 from orbcomm_tracker.sync import SyncOrchestrator  # noqa: E402
 
 # Configure logging to file
@@ -52,6 +53,7 @@ def run_daily_sync(inbox_numbers: list = None):
 
     # Sync each inbox
     for inbox_number in inbox_numbers:
+        sync = None
         try:
             logger.info("=" * 70)
             logger.info(f"Syncing Inbox {inbox_number}")
@@ -67,8 +69,6 @@ def run_daily_sync(inbox_numbers: list = None):
             logger.info(f"Inbox {inbox_number} sync results: {result}")
             all_results[inbox_number] = result
 
-            sync.close()
-
         except FileNotFoundError as e:
             logger.warning(f"Inbox {inbox_number} not authenticated: {e}")
             logger.warning(f"Skipping inbox {inbox_number}")
@@ -78,6 +78,10 @@ def run_daily_sync(inbox_numbers: list = None):
             logger.error(f"Inbox {inbox_number} sync failed: {e}", exc_info=True)
             failed_inboxes.append(inbox_number)
             continue
+        finally:
+            # Stops the inbox's token refresh and closes the shared connection
+            if sync is not None:
+                sync.close()
 
     # If all inboxes failed, exit with error
     if len(failed_inboxes) == len(inbox_numbers):
@@ -119,10 +123,10 @@ def run_daily_sync(inbox_numbers: list = None):
         sync.db.vacuum()
         logger.info("Database vacuumed")
 
-        sync.close()
-
     except Exception as e:
         logger.error(f"Post-sync maintenance failed: {e}", exc_info=True)
+    finally:
+        close_shared_db()
 
     # Summary
     logger.info("=" * 70)
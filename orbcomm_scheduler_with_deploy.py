@@ -13,6 +13,7 @@ from pathlib import Path
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from orbcomm_tracker.database import close_shared_db  # noqa: E402
 from orbcomm_tracker.sync import SyncOrchestrator  # noqa: E402
 
 # Configure logging to file
@@ -166,6 +167,7 @@ def run_daily_sync_with_deploy(inbox_numbers: list = None, auto_push: bool = Tru
 
     # Sync each inbox
     for inbox_number in inbox_numbers:
+        sync = None
         try:
             logger.info("=" * 70)
             logger.info(f"Syncing Inbox {inbox_number}")
@@ -181,8 +183,6 @@ def run_daily_sync_with_deploy(inbox_numbers: list = None, auto_push: bool = Tru
             logger.info(f"Inbox {inbox_number} sync results: {result}")
             all_results[inbox_number] = result
 
-            sync.close()
-
         except FileNotFoundError as e:
             logger.warning(f"Inbox {inbox_number} not authenticated: {e}")
             logger.warning(f"Skipping inbox {inbox_number}")
@@ -192,6 +192,10 @@ def run_daily_sync_with_deploy(inbox_numbers: list = None, auto_push: bool = Tru
             logger.error(f"Inbox {inbox_number} sync failed: {e}", exc_info=True)
             failed_inboxes.append(inbox_number)
             continue
+        finally:
+            # Stops the inbox's token refresh and closes the shared connection
+            if sync is not None:
+                sync.close()
 
     # If all inboxes failed, exit with error
     if len(failed_inboxes) == len(inbox_numbers):
@@ -236,11 +240,11 @@ def run_daily_sync_with_deploy(inbox_numbers: list = None, auto_push: bool = Tru
         # Get database path
         db_path = sync.db.db_path
 
-        sync.close()
-
     except Exception as e:
         logger.error(f"Post-sync maintenance failed: {e}", exc_info=True)
         db_path = str(Path.home() / ".orbcomm" / "tracker.db")
+    finally:
+        close_shared_db()
 
     # Export database and push to git
     if auto_push:
@@ -7,36 +7,117 @@ import json
 import logging
 import os
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+from orbcomm_tracker.models import NOTIFICATION_COLUMNS, Notification
 
 logger = logging.getLogger(__name__)
 
+# Prepared statements cached per connection (sqlite3 default: 128). Queries
+# built per call, like IN (...) lists of varying length, each take a slot;
+# a larger cache keeps the fixed INSERT/SELECT statements from being evicted.
+STATEMENT_CACHE_SIZE = 512
+
+# Insert column order for notifications; values are read from the input dict
+# with map(dict.get, ...) so the per-field lookups run in C
+NOTIFICATION_FIELDS = (
+    "reference_number",
+    "gmail_message_id",
+    "thread_id",
+    "inbox_source",
+    "date_received",
+    "time_received",
+    "platform",
+    "event_type",
+    "status",
+    "priority",
+    "scheduled_date",
+    "scheduled_time",
+    "duration",
+    "affected_services",
+    "summary",
+    "raw_email_body",
+    "raw_email_subject",
+    "incident_start_time",
+    "incident_end_time",
+    "incident_duration_minutes",
+)
+NOTIFICATION_DEFAULTS = {"status": "Open", "priority": "Medium"}
+# Insert columns declared NOT NULL in the notifications table
+REQUIRED_NOTIFICATION_FIELDS = (
+    "reference_number",
+    "gmail_message_id",
+    "date_received",
+    "event_type",
+    "summary",
+)
+
+# date_received_ts is derived in SQL from the bound date_received parameter
+INSERT_NOTIFICATION_SQL = f"""
+    INSERT INTO notifications ({", ".join(NOTIFICATION_FIELDS)}, date_received_ts)
+    VALUES (
+        {", ".join("?" * len(NOTIFICATION_FIELDS))},
+        CAST(strftime('%s', ?{NOTIFICATION_FIELDS.index("date_received") + 1}) AS INTEGER)
+    )
+"""
+
+# Bulk variant: rows whose gmail_message_id is already stored are skipped.
+# Unlike OR IGNORE, other constraint failures still raise instead of
+# silently dropping the row.
+INSERT_NOTIFICATION_NEW_SQL = f"""{INSERT_NOTIFICATION_SQL.rstrip()}
+    ON CONFLICT(gmail_message_id) DO NOTHING
+"""
+
+
+def _notification_values(data: Dict) -> tuple:
+    """Insert parameters for a notification dict, in NOTIFICATION_FIELDS order"""
+    return tuple(map({**NOTIFICATION_DEFAULTS, **data}.get, NOTIFICATION_FIELDS))
+
 
 class Database:
     """SQLite database manager for ORBCOMM notifications"""
 
-    def __init__(self, db_path: str = None):
-        """Initialize database connection"""
+    def __init__(self, db_path: str = None, uri: bool = False):
+        """
+        Initialize database connection
+
+        Args:
+            db_path: Database file path, or a "file:" URI when uri is True
+                (e.g. "file:test?mode=memory&cache=shared" for tests)
+            uri: Interpret db_path as an SQLite URI
+        """
         if db_path is None:
             # Use DATABASE_PATH env var for production (Render), fallback to home dir for local dev
             db_path = os.environ.get("DATABASE_PATH", str(Path.home() / ".orbcomm" / "tracker.db"))
-        db_path = Path(db_path)
 
-        # Ensure directory exists
-        db_path.parent.mkdir(parents=True, exist_ok=True)
+        if not uri:
+            db_path = Path(db_path)
+            # Ensure directory exists
+            db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = str(db_path)
+        self.uri = uri
         self.conn = None
         self._connect()
         self._initialize_schema()
 
     def _connect(self):
         """Establish database connection"""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(
+            self.db_path, uri=self.uri, cached_statements=STATEMENT_CACHE_SIZE
+        )
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
         self.conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
+        # Reclaim free pages in small steps (see vacuum); existing databases
+        # pick this up on their next full VACUUM. Must precede journal_mode,
+        # which writes the header of a new database file.
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets readers run during a sync; NORMAL only fsyncs at checkpoints
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
 
     def _initialize_schema(self):
         """Create database schema if not exists"""
@@ -54,6 +135,7 @@ class Database:
 
                 -- Timestamps
                 date_received DATETIME NOT NULL,
+                date_received_ts INTEGER,
                 time_received TIME,
                 date_parsed DATETIME DEFAULT CURRENT_TIMESTAMP,
                 last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -124,6 +206,28 @@ class Database:
         """
         )
 
+        # Per-snapshot breakdowns (one row per platform / event type)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stats_snapshot_platform (
+                snapshot_id INTEGER NOT NULL,
+                platform TEXT,
+                count INTEGER NOT NULL,
+                FOREIGN KEY (snapshot_id) REFERENCES stats_snapshots(id) ON DELETE CASCADE
+            )
+        """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stats_snapshot_event (
+                snapshot_id INTEGER NOT NULL,
+                event_type TEXT,
+                count INTEGER NOT NULL,
+                FOREIGN KEY (snapshot_id) REFERENCES stats_snapshots(id) ON DELETE CASCADE
+            )
+        """
+        )
+
         # Sync history
         cursor.execute(
             """
@@ -158,22 +262,13 @@ class Database:
             "CREATE INDEX IF NOT EXISTS idx_notifications_reference ON notifications(reference_number)"
         )
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_notifications_status ON notifications(status)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_notifications_date ON notifications(date_received)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_notifications_platform ON notifications(platform)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_notifications_gmail_id ON notifications(gmail_message_id)"
+            "CREATE INDEX IF NOT EXISTS idx_sync_history_date ON sync_history(sync_start)"
         )
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_notifications_archived ON notifications(is_archived)"
+            "CREATE INDEX IF NOT EXISTS idx_snapshot_platform_snapshot ON stats_snapshot_platform(snapshot_id)"
         )
         cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_sync_history_date ON sync_history(sync_start)"
+            "CREATE INDEX IF NOT EXISTS idx_snapshot_event_snapshot ON stats_snapshot_event(snapshot_id)"
         )
 
         self.conn.commit()
@@ -224,6 +319,79 @@ class Database:
                 "Migration complete: incident_duration_minutes added to notification_pairs"
             )
 
+        # Integer epoch copy of date_received for cheap sorting and range scans
+        if "date_received_ts" not in columns:
+            logger.info("Migrating database: Adding date_received_ts to notifications")
+            cursor.execute(
+                "ALTER TABLE notifications ADD COLUMN date_received_ts INTEGER"
+            )
+            cursor.execute(
+                """
+                UPDATE notifications
+                SET date_received_ts = CAST(strftime('%s', date_received) AS INTEGER)
+            """
+            )
+            self.conn.commit()
+            logger.info("Migration complete: date_received_ts backfilled")
+
+        # Move JSON snapshot breakdowns into the structured child tables
+        cursor.execute(
+            """
+            SELECT id, platform_breakdown, event_type_breakdown FROM stats_snapshots
+            WHERE platform_breakdown IS NOT NULL OR event_type_breakdown IS NOT NULL
+        """
+        )
+        legacy_snapshots = cursor.fetchall()
+        if legacy_snapshots:
+            logger.info(
+                f"Migrating database: Normalizing {len(legacy_snapshots)} stats snapshots"
+            )
+            for snapshot_id, platforms, events in legacy_snapshots:
+                self._insert_snapshot_breakdowns(
+                    cursor,
+                    snapshot_id,
+                    json.loads(platforms) if platforms else {},
+                    json.loads(events) if events else {},
+                )
+            cursor.execute(
+                """
+                UPDATE stats_snapshots
+                SET platform_breakdown = NULL, event_type_breakdown = NULL
+            """
+            )
+            self.conn.commit()
+            logger.info("Migration complete: Stats snapshot breakdowns normalized")
+
+        # Superseded indexes: gmail_message_id is covered by its UNIQUE constraint,
+        # is_archived is too low-cardinality to help, and the rest are replaced
+        # by the partial indexes below
+        for index_name in (
+            "idx_notifications_date",
+            "idx_notifications_gmail_id",
+            "idx_notifications_archived",
+            "idx_notifications_status",
+            "idx_notifications_platform",
+        ):
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notifications_date_ts ON notifications(date_received_ts)"
+        )
+        # Live (non-archived) rows are what nearly every read filters on
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_notif_status_live
+            ON notifications(status, date_received_ts) WHERE is_archived = 0
+        """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_notif_platform_live
+            ON notifications(platform) WHERE is_archived = 0
+        """
+        )
+        self.conn.commit()
+
     def create_tables(self):
         """
         Public method to create database tables.
@@ -232,6 +400,27 @@ class Database:
         """
         self._initialize_schema()
 
+    # ==================== Row Conversion ====================
+
+    @staticmethod
+    def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+        """
+        Fetch all rows from an executed cursor as dicts.
+
+        dict(sqlite3.Row) resolves every column by name; zipping the column
+        names once against each row keeps the per-row work in C.
+        """
+        cols = [d[0] for d in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _fetch_dict(cursor: sqlite3.Cursor) -> Optional[Dict]:
+        """Fetch the next row from an executed cursor as a dict"""
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([d[0] for d in cursor.description], row))
+
     # ==================== Notification Operations ====================
 
     def insert_notification(self, data: Dict) -> Optional[int]:
@@ -246,39 +435,7 @@ class Database:
         """
         try:
             cursor = self.conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO notifications (
-                    reference_number, gmail_message_id, thread_id, inbox_source,
-                    date_received, time_received, platform, event_type, status, priority,
-                    scheduled_date, scheduled_time, duration, affected_services, summary,
-                    raw_email_body, raw_email_subject,
-                    incident_start_time, incident_end_time, incident_duration_minutes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    data.get("reference_number"),
-                    data.get("gmail_message_id"),
-                    data.get("thread_id"),
-                    data.get("inbox_source"),
-                    data.get("date_received"),
-                    data.get("time_received"),
-                    data.get("platform"),
-                    data.get("event_type"),
-                    data.get("status", "Open"),
-                    data.get("priority", "Medium"),
-                    data.get("scheduled_date"),
-                    data.get("scheduled_time"),
-                    data.get("duration"),
-                    data.get("affected_services"),
-                    data.get("summary"),
-                    data.get("raw_email_body"),
-                    data.get("raw_email_subject"),
-                    data.get("incident_start_time"),
-                    data.get("incident_end_time"),
-                    data.get("incident_duration_minutes"),
-                ),
-            )
+            cursor.execute(INSERT_NOTIFICATION_SQL, _notification_values(data))
             self.conn.commit()
             logger.info(f"Inserted notification: {data.get('reference_number')}")
             return cursor.lastrowid
@@ -291,6 +448,64 @@ class Database:
             logger.error(f"Error inserting notification: {e}")
             return None
 
+    def insert_notifications_many(self, rows: List[Dict]) -> Optional[Tuple[int, int]]:
+        """
+        Insert notifications in a single transaction, skipping duplicates.
+
+        Args:
+            rows: List of dictionaries with notification fields
+
+        Returns:
+            (inserted, rejected) counts, None on error. Rows that are neither
+            were skipped as already stored.
+        """
+        return self.insert_notifications_rows(list(map(_notification_values, rows)))
+
+    def insert_notifications_rows(self, rows: List[tuple]) -> Optional[Tuple[int, int]]:
+        """
+        Insert ready-made parameter tuples in a single transaction, skipping duplicates.
+
+        Args:
+            rows: Value tuples in NOTIFICATION_FIELDS order; unlike
+                insert_notifications_many, NOTIFICATION_DEFAULTS are not applied
+
+        Returns:
+            (inserted, rejected) counts, None on error. Rejected rows failed a
+            constraint; the rest were skipped as already stored.
+        """
+        if not rows:
+            return 0, 0
+
+        try:
+            rejected = 0
+            before = self.conn.total_changes
+            try:
+                with self.conn:
+                    self.conn.executemany(INSERT_NOTIFICATION_NEW_SQL, rows)
+            except sqlite3.IntegrityError as e:
+                # Some row is invalid; store the rest, still in one commit.
+                # total_changes also counted the rows that were rolled back.
+                logger.warning(f"Batch insert failed ({e}), inserting row by row")
+                before = self.conn.total_changes
+                with self.conn:
+                    for row in rows:
+                        try:
+                            self.conn.execute(INSERT_NOTIFICATION_NEW_SQL, row)
+                        except sqlite3.IntegrityError as row_error:
+                            rejected += 1
+                            # reference_number is the first NOTIFICATION_FIELDS column
+                            logger.error(
+                                f"Invalid notification: {row[0]} - {row_error}"
+                            )
+            inserted = self.conn.total_changes - before
+            logger.info(
+                f"Inserted {inserted} of {len(rows)} notifications ({rejected} rejected)"
+            )
+            return inserted, rejected
+        except Exception as e:
+            logger.error(f"Error inserting notifications: {e}")
+            return None
+
     def get_notification_by_reference(self, reference_number: str) -> Optional[Dict]:
         """Get notification by reference number"""
         cursor = self.conn.cursor()
@@ -298,8 +513,7 @@ class Database:
             "SELECT * FROM notifications WHERE reference_number = ?",
             (reference_number,),
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return self._fetch_dict(cursor)
 
     def get_notification_by_gmail_id(self, gmail_message_id: str) -> Optional[Dict]:
         """Get notification by Gmail message ID"""
@@ -308,19 +522,45 @@ class Database:
             "SELECT * FROM notifications WHERE gmail_message_id = ?",
             (gmail_message_id,),
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return self._fetch_dict(cursor)
+
+    def get_existing_gmail_ids(self, gmail_message_ids: List[str]) -> Set[str]:
+        """
+        Return the subset of Gmail message IDs already stored
+
+        One IN (...) query per 500 IDs (kept under SQLite's bound-parameter
+        limit) instead of one lookup per message; served by the UNIQUE index
+        on gmail_message_id.
+        """
+        existing = set()
+        cursor = self.conn.cursor()
+        for start in range(0, len(gmail_message_ids), 500):
+            chunk = gmail_message_ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT gmail_message_id FROM notifications WHERE gmail_message_id IN ({placeholders})",
+                chunk,
+            )
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
 
     def get_all_notifications(self, include_archived: bool = False) -> List[Dict]:
         """Get all notifications"""
         cursor = self.conn.cursor()
         if include_archived:
-            cursor.execute("SELECT * FROM notifications ORDER BY date_received DESC")
+            cursor.execute("SELECT * FROM notifications ORDER BY date_received_ts DESC")
         else:
             cursor.execute(
-                "SELECT * FROM notifications WHERE is_archived = 0 ORDER BY date_received DESC"
+                "SELECT * FROM notifications WHERE is_archived = 0 ORDER BY date_received_ts DESC"
             )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_dicts(cursor)
+
+    def count_notifications(self, include_archived: bool = False) -> int:
+        """Number of notifications, without fetching any rows"""
+        sql = "SELECT COUNT(*) FROM notifications"
+        if not include_archived:
+            sql += " WHERE is_archived = 0"
+        return self.conn.execute(sql).fetchone()[0]
 
     def get_notifications_by_status(
         self, status: str, include_archived: bool = False
@@ -329,7 +569,7 @@ class Database:
         cursor = self.conn.cursor()
         if include_archived:
             cursor.execute(
-                "SELECT * FROM notifications WHERE status = ? ORDER BY date_received DESC",
+                "SELECT * FROM notifications WHERE status = ? ORDER BY date_received_ts DESC",
                 (status,),
             )
         else:
@@ -337,18 +577,53 @@ class Database:
                 """
                 SELECT * FROM notifications
                 WHERE status = ? AND is_archived = 0
-                ORDER BY date_received DESC
+                ORDER BY date_received_ts DESC
             """,
                 (status,),
             )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_dicts(cursor)
+
+    def get_notification_records(
+        self, status: Optional[str] = None, include_archived: bool = False
+    ) -> List[Notification]:
+        """
+        Get notifications as slotted Notification records.
+
+        Lighter-weight alternative to the dict getters for large scans such as
+        exports, where per-row dict overhead dominates.
+        """
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if not include_archived:
+            conditions.append("is_archived = 0")
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            f"""
+            SELECT {NOTIFICATION_COLUMNS} FROM notifications
+            {where_clause}
+            ORDER BY date_received_ts DESC
+        """,
+            params,
+        )
+        return [Notification(*row) for row in cursor.fetchall()]
 
     def update_notification(self, reference_number: str, updates: Dict) -> bool:
         """Update notification fields"""
         try:
             updates["last_updated"] = datetime.now().isoformat()
             set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
-            values = list(updates.values()) + [reference_number]
+            values = list(updates.values())
+            if "date_received" in updates:
+                # Keep the integer copy in step with the ISO column
+                set_clause += ", date_received_ts = CAST(strftime('%s', ?) AS INTEGER)"
+                values.append(updates["date_received"])
+            values.append(reference_number)
 
             cursor = self.conn.cursor()
             cursor.execute(
@@ -378,10 +653,10 @@ class Database:
             # Get Open and Resolved notifications (including incident duration)
             cursor.execute(
                 """
-                SELECT id, date_received, time_received, status, incident_duration_minutes
+                SELECT id, date_received_ts, time_received, status, incident_duration_minutes
                 FROM notifications
                 WHERE reference_number = ?
-                ORDER BY date_received
+                ORDER BY date_received_ts
             """,
                 (reference_number,),
             )
@@ -404,10 +679,9 @@ class Database:
                 return False
 
             # Calculate email processing time (time from open notification to resolved notification)
-            open_dt = datetime.fromisoformat(open_notif["date_received"])
-            resolved_dt = datetime.fromisoformat(resolved_notif["date_received"])
+            resolved_ts = resolved_notif["date_received_ts"]
             time_to_resolve = int(
-                (resolved_dt - open_dt).total_seconds() / 60
+                (resolved_ts - open_notif["date_received_ts"]) / 60
             )  # minutes
 
             # Get incident duration from resolved notification (if available)
@@ -434,10 +708,11 @@ class Database:
             cursor.execute(
                 """
                 UPDATE notifications
-                SET resolution_date = ?, time_to_resolve_minutes = ?
+                SET resolution_date = strftime('%Y-%m-%dT%H:%M:%S', ?, 'unixepoch'),
+                    time_to_resolve_minutes = ?
                 WHERE id = ?
             """,
-                (resolved_dt.isoformat(), time_to_resolve, resolved_notif["id"]),
+                (resolved_ts, time_to_resolve, resolved_notif["id"]),
             )
 
             # Mark ALL Open/Continuing notifications as Resolved (Resolved is final state)
@@ -459,6 +734,109 @@ class Database:
             logger.error(f"Error linking pair {reference_number}: {e}")
             return False
 
+    def link_all_notification_pairs(self, inbox_source: Optional[str] = None) -> int:
+        """
+        Link Open and Resolved notifications for every reference number at once.
+        Same pairing rules as link_notification_pair, done in set-based SQL.
+
+        Args:
+            inbox_source: Only link references seen in this inbox (None = all)
+
+        Returns:
+            Number of pairs newly linked (pairs already stored are left as is)
+        """
+        try:
+            with self.conn:
+                cursor = self.conn.cursor()
+
+                # First Open and first Resolved notification per reference
+                cursor.execute("DROP TABLE IF EXISTS temp.pending_pairs")
+                cursor.execute(
+                    """
+                    CREATE TEMP TABLE pending_pairs AS
+                    WITH ranked AS (
+                        SELECT id, reference_number, status, date_received_ts,
+                               incident_duration_minutes,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY reference_number, status
+                                   ORDER BY date_received_ts, id
+                               ) AS rn
+                        FROM notifications
+                        WHERE status IN ('Open', 'Resolved')
+                        AND (?1 IS NULL OR reference_number IN (
+                            SELECT reference_number FROM notifications
+                            WHERE inbox_source = ?1
+                        ))
+                    )
+                    SELECT o.reference_number,
+                           o.id AS open_id,
+                           r.id AS resolved_id,
+                           r.date_received_ts AS resolved_ts,
+                           (r.date_received_ts - o.date_received_ts) / 60 AS minutes,
+                           r.incident_duration_minutes
+                    FROM ranked o
+                    JOIN ranked r ON r.reference_number = o.reference_number
+                    WHERE o.status = 'Open' AND o.rn = 1
+                    AND r.status = 'Resolved' AND r.rn = 1
+                    AND o.date_received_ts IS NOT NULL
+                    AND r.date_received_ts IS NOT NULL
+                """,
+                    (inbox_source,),
+                )
+
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO notification_pairs
+                    (reference_number, open_notification_id, resolved_notification_id,
+                     time_to_resolve_minutes, incident_duration_minutes)
+                    SELECT reference_number, open_id, resolved_id, minutes,
+                           incident_duration_minutes
+                    FROM pending_pairs AS p
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM notification_pairs AS np
+                        WHERE np.reference_number = p.reference_number
+                        AND np.open_notification_id = p.open_id
+                        AND np.resolved_notification_id = p.resolved_id
+                    )
+                """
+                )
+                linked = cursor.rowcount
+
+                # Update resolved notifications
+                cursor.execute(
+                    """
+                    UPDATE notifications
+                    SET resolution_date = strftime(
+                            '%Y-%m-%dT%H:%M:%S', p.resolved_ts, 'unixepoch'
+                        ),
+                        time_to_resolve_minutes = p.minutes
+                    FROM pending_pairs AS p
+                    WHERE notifications.id = p.resolved_id
+                    AND notifications.time_to_resolve_minutes IS NOT p.minutes
+                """
+                )
+
+                # Mark ALL Open/Continuing notifications as Resolved (Resolved is final state)
+                cursor.execute(
+                    """
+                    UPDATE notifications
+                    SET status = 'Resolved'
+                    WHERE status IN ('Open', 'Continuing')
+                    AND reference_number IN (
+                        SELECT reference_number FROM pending_pairs
+                    )
+                """
+                )
+
+                cursor.execute("DROP TABLE temp.pending_pairs")
+
+            logger.info(f"Linked {linked} notification pairs")
+            return linked
+
+        except Exception as e:
+            logger.error(f"Error linking notification pairs: {e}")
+            return 0
+
     def get_notification_pairs(self) -> List[Dict]:
         """Get all notification pairs"""
         cursor = self.conn.cursor()
@@ -468,7 +846,12 @@ class Database:
             ORDER BY id DESC
         """
         )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_dicts(cursor)
+
+    def count_pairs(self) -> int:
+        """Number of notification pairs, without fetching any rows"""
+        cursor = self.conn.execute("SELECT COUNT(*) FROM notification_pairs")
+        return cursor.fetchone()[0]
 
     # ==================== Stats Operations ====================
 
@@ -587,6 +970,26 @@ class Database:
             "avg_incident_duration_minutes": round(avg_incident, 2),
         }
 
+    @staticmethod
+    def _insert_snapshot_breakdowns(
+        cursor: sqlite3.Cursor, snapshot_id: int, platforms: Dict, events: Dict
+    ):
+        """Insert platform and event type breakdown rows for a snapshot"""
+        cursor.executemany(
+            """
+            INSERT INTO stats_snapshot_platform (snapshot_id, platform, count)
+            VALUES (?, ?, ?)
+        """,
+            [(snapshot_id, platform, count) for platform, count in platforms.items()],
+        )
+        cursor.executemany(
+            """
+            INSERT INTO stats_snapshot_event (snapshot_id, event_type, count)
+            VALUES (?, ?, ?)
+        """,
+            [(snapshot_id, event, count) for event, count in events.items()],
+        )
+
     def save_stats_snapshot(self) -> bool:
         """Save current stats as a snapshot"""
         try:
@@ -596,8 +999,8 @@ class Database:
                 """
                 INSERT INTO stats_snapshots (
                     total_notifications, open_count, resolved_count, continuing_count,
-                    avg_resolution_time_minutes, platform_breakdown, event_type_breakdown
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    avg_resolution_time_minutes
+                ) VALUES (?, ?, ?, ?, ?)
             """,
                 (
                     stats["total_notifications"],
@@ -605,45 +1008,85 @@ class Database:
                     stats["resolved_count"],
                     stats["continuing_count"],
                     stats["avg_resolution_time_minutes"],
-                    json.dumps(stats["platform_breakdown"]),
-                    json.dumps(stats["event_type_breakdown"]),
                 ),
             )
+            self._insert_snapshot_breakdowns(
+                cursor,
+                cursor.lastrowid,
+                stats["platform_breakdown"],
+                stats["event_type_breakdown"],
+            )
             self.conn.commit()
             logger.info("Stats snapshot saved")
             return True
         except Exception as e:
+            self.conn.rollback()
             logger.error(f"Error saving snapshot: {e}")
             return False
 
     def get_historical_stats(self, days: int = 30) -> List[Dict]:
-        """Get historical stats snapshots"""
+        """Get historical stats snapshots with their breakdowns"""
         cursor = self.conn.cursor()
         since_date = (datetime.now() - timedelta(days=days)).isoformat()
         cursor.execute(
             """
-            SELECT * FROM stats_snapshots
+            SELECT id, snapshot_date, total_notifications, open_count, resolved_count,
+                   continuing_count, avg_resolution_time_minutes
+            FROM stats_snapshots
             WHERE snapshot_date >= ?
             ORDER BY snapshot_date
         """,
             (since_date,),
         )
-        return [dict(row) for row in cursor.fetchall()]
+        snapshots = self._fetch_dicts(cursor)
+
+        by_id = {}
+        for snapshot in snapshots:
+            snapshot["platform_breakdown"] = {}
+            snapshot["event_type_breakdown"] = {}
+            by_id[snapshot["id"]] = snapshot
+
+        cursor.execute(
+            """
+            SELECT p.snapshot_id, p.platform, p.count
+            FROM stats_snapshot_platform p
+            JOIN stats_snapshots s ON s.id = p.snapshot_id
+            WHERE s.snapshot_date >= ?
+        """,
+            (since_date,),
+        )
+        for snapshot_id, platform, count in cursor.fetchall():
+            by_id[snapshot_id]["platform_breakdown"][platform] = count
+
+        cursor.execute(
+            """
+            SELECT e.snapshot_id, e.event_type, e.count
+            FROM stats_snapshot_event e
+            JOIN stats_snapshots s ON s.id = e.snapshot_id
+            WHERE s.snapshot_date >= ?
+        """,
+            (since_date,),
+        )
+        for snapshot_id, event_type, count in cursor.fetchall():
+            by_id[snapshot_id]["event_type_breakdown"][event_type] = count
+
+        return snapshots
 
     # ==================== Archive Operations ====================
 
     def archive_old_notifications(self, days: int = 180) -> int:
         """Archive notifications older than specified days"""
         try:
-            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+            # date_received is naive local time, so compare against local "now"
             cursor = self.conn.cursor()
             cursor.execute(
                 """
                 UPDATE notifications
                 SET is_archived = 1
-                WHERE date_received < ? AND is_archived = 0
+                WHERE date_received_ts < CAST(strftime('%s', 'now', 'localtime', ?) AS INTEGER)
+                AND is_archived = 0
             """,
-                (cutoff_date,),
+                (f"-{days} days",),
             )
             self.conn.commit()
             archived_count = cursor.rowcount
@@ -659,9 +1102,9 @@ class Database:
         """Get all archived notifications"""
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT * FROM notifications WHERE is_archived = 1 ORDER BY date_received DESC"
+            "SELECT * FROM notifications WHERE is_archived = 1 ORDER BY date_received_ts DESC"
         )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_dicts(cursor)
 
     # ==================== Sync Operations ====================
 
@@ -686,23 +1129,43 @@ class Database:
         errors_count: int,
         status: str,
         error_log: str = None,
+        config: Optional[Dict[str, str]] = None,
     ):
-        """Log completion of sync operation"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            UPDATE sync_history
-            SET sync_end = CURRENT_TIMESTAMP,
-                emails_fetched = ?,
-                emails_parsed = ?,
-                errors_count = ?,
-                status = ?,
-                error_log = ?
-            WHERE id = ?
-        """,
-            (emails_fetched, emails_parsed, errors_count, status, error_log, sync_id),
-        )
-        self.conn.commit()
+        """
+        Log completion of sync operation
+
+        Args:
+            config: Configuration values to set in the same transaction
+        """
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE sync_history
+                SET sync_end = CURRENT_TIMESTAMP,
+                    emails_fetched = ?,
+                    emails_parsed = ?,
+                    errors_count = ?,
+                    status = ?,
+                    error_log = ?
+                WHERE id = ?
+            """,
+                (
+                    emails_fetched,
+                    emails_parsed,
+                    errors_count,
+                    status,
+                    error_log,
+                    sync_id,
+                ),
+            )
+            if config:
+                self.conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO config (key, value, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                """,
+                    config.items(),
+                )
 
     def get_last_sync_date(self, inbox_source: str = None) -> Optional[datetime]:
         """Get date of last successful sync"""
@@ -738,7 +1201,7 @@ class Database:
         """,
             (limit,),
         )
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetch_dicts(cursor)
 
     # ==================== Config Operations ====================
 
@@ -775,13 +1238,55 @@ class Database:
                 f"{self.db_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             )
 
-        import shutil
-
-        shutil.copy2(self.db_path, backup_path)
+        # SQLite online backup copies pages consistently even with open writers;
+        # it reads through this connection, so commits still in the WAL are
+        # included without a checkpoint first
+        dest = sqlite3.connect(backup_path)
+        try:
+            self.conn.backup(dest)
+        finally:
+            dest.close()
         logger.info(f"Database backed up to {backup_path}")
         return backup_path
 
-    def vacuum(self):
-        """Optimize database"""
+    def vacuum(self, max_pages: int = 1000):
+        """
+        Reclaim up to max_pages free pages without rewriting the database.
+
+        Falls back to a one-off full VACUUM for databases created before
+        incremental auto-vacuum was enabled, which also converts them.
+        """
+        mode = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:  # 2 = INCREMENTAL
+            self.full_vacuum()
+            return
+
+        # The pragma frees pages as it is stepped, so drain the cursor
+        self.conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        logger.info(f"Database incrementally vacuumed (up to {max_pages} pages)")
+
+    def full_vacuum(self):
+        """Rebuild the entire database file (blocks all access while running)"""
         self.conn.execute("VACUUM")
         logger.info("Database vacuumed")
+
+
+# One Database per thread, shared by everything that does not pass its own.
+# SQLite connections may only be used by the thread that opened them.
+_shared = threading.local()
+
+
+def get_shared_db() -> Database:
+    """Database for the current thread, opened on first use and then reused"""
+    db = getattr(_shared, "db", None)
+    if db is None:
+        db = _shared.db = Database()
+    return db
+
+
+def close_shared_db():
+    """Close the current thread's shared Database, if one was opened"""
+    db = getattr(_shared, "db", None)
+    if db is not None:
+        _shared.db = None
+        db.close()
@@ -3,21 +3,260 @@ Gmail API Integration Layer
 Handles authentication and email fetching for ORBCOMM tracker
 """
 
-import base64
+import binascii
+import fcntl
 import logging
 import os
-from datetime import datetime, timedelta
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterator, List, Optional
 
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 logger = logging.getLogger(__name__)
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 SEARCH_QUERY = 'subject:"ORBCOMM Service Notification:"'
+LIST_PAGE_SIZE = 500  # Gmail's maximum maxResults for messages.list
+BATCH_SIZE = 100  # Gmail accepts at most 100 calls per batch request
+MAX_BATCH_WORKERS = 8  # Concurrent batches, kept low for the per-user quota
+MIN_BATCH_SIZE = 10  # Floor for the adaptive batch size under rate limiting
+BATCH_RECOVERY_SUCCESSES = 20  # Clean batches before the batch size doubles
+MAX_BACKOFF_SECONDS = 60
+MAX_RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Partial response mask: only what _extract_email_content reads
+MESSAGE_FIELDS = (
+    "id,threadId,internalDate,payload(headers,body/data,parts(mimeType,body/data))"
+)
+# Partial response mask for messages.list pages
+LIST_FIELDS = "messages/id,nextPageToken"
+
+
+# Headers _extract_email_content reads from each message
+WANTED_HEADERS = frozenset({"Subject", "Date"})
+
+
+# Maps the URL-safe base64 alphabet Gmail uses onto the standard one
+_B64_TR = bytes.maketrans(b"-_", b"+/")
+
+
+# Credentials shared by every GmailAPI instance in the process, by token path
+_token_cache: Dict[str, Credentials] = {}
+_token_cache_lock = threading.Lock()
+_refresh_timers: Dict[str, threading.Timer] = {}
+
+
+def _is_fresh(creds: Credentials) -> bool:
+    """Check whether credentials stay valid for at least TOKEN_REFRESH_MARGIN"""
+    if not creds.valid:
+        return False
+    if creds.expiry is None:
+        return True
+    # google-auth stores expiry as naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - TOKEN_REFRESH_MARGIN > now
+
+
+def _load_credentials(token_file: Path) -> Credentials:
+    """
+    Load credentials from token.json, refreshing them if close to expiry
+
+    Refreshes happen under an exclusive lock on token.lock so that
+    concurrent workers perform a single refresh and share its result.
+    """
+    creds = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+    if _is_fresh(creds) or not creds.refresh_token:
+        return creds
+
+    lock_path = token_file.with_suffix(".lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        # Another process may have refreshed while we waited for the lock
+        creds = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+        if not _is_fresh(creds):
+            logger.info(f"Refreshing expired token {token_file}")
+            creds.refresh(Request())
+            _save_token(creds, token_file)
+            logger.info(f"Token refreshed and saved to {token_file}")
+
+    return creds
+
+
+def _save_token(creds: Credentials, token_file: Path):
+    """Write token.json atomically so readers never see a partial file"""
+    tmp_path = token_file.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(creds.to_json())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, token_file)
+
+
+def _schedule_refresh(
+    token_file: Path,
+    creds: Credentials,
+    replacing: Optional[threading.Timer] = None,
+):
+    """
+    Refresh the cached credentials for token_file shortly before they expire
+
+    Keeps token acquisition off the request path. At most one timer runs
+    per token file, and it holds only the path, so no GmailAPI instance is
+    kept alive by it.
+
+    Args:
+        token_file: token.json the credentials were loaded from
+        creds: Credentials whose expiry sets the delay
+        replacing: Timer rescheduling itself; skipped if it was cancelled
+    """
+    if creds.expiry is None or not creds.refresh_token:
+        return
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    delay = (creds.expiry - TOKEN_REFRESH_MARGIN - now).total_seconds()
+    cache_key = str(token_file)
+
+    with _token_cache_lock:
+        timer = _refresh_timers.get(cache_key)
+        if replacing is not None:
+            if timer is not replacing:
+                return  # cancelled while refreshing
+        elif timer is not None and timer.is_alive():
+            return
+        timer = threading.Timer(max(delay, 0), _background_refresh, args=(token_file,))
+        timer.daemon = True
+        _refresh_timers[cache_key] = timer
+        timer.start()
+
+
+def _background_refresh(token_file: Path):
+    """Timer callback: refresh the token and update the cached credentials"""
+    cache_key = str(token_file)
+    timer = threading.current_thread()
+    try:
+        creds = _load_credentials(token_file)
+    except Exception as e:
+        logger.warning(f"Background token refresh failed for {token_file}: {e}")
+        with _token_cache_lock:
+            if _refresh_timers.get(cache_key) is timer:
+                del _refresh_timers[cache_key]
+        return
+
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+        if cached is None:
+            _token_cache[cache_key] = creds
+        elif creds.token != cached.token:
+            # Update in place so services built from these credentials
+            # pick up the new token without being rebuilt
+            cached.token = creds.token
+            cached.expiry = creds.expiry
+
+    _schedule_refresh(token_file, creds, replacing=timer)
+
+
+def cancel_token_refresh(token_file: Path):
+    """Stop the background refresh for token_file, if one is scheduled"""
+    with _token_cache_lock:
+        timer = _refresh_timers.pop(str(token_file), None)
+    if timer is not None:
+        timer.cancel()
+
+
+def _extract_headers(
+    headers: List[Dict], wanted: FrozenSet[str] = WANTED_HEADERS
+) -> Dict[str, str]:
+    """Map header names to values, keeping only the wanted names"""
+    return {h["name"]: h["value"] for h in headers if h["name"] in wanted}
+
+
+def _decode_body(data: str) -> str:
+    """Decode a URL-safe base64 message body straight to text"""
+    raw = binascii.a2b_base64(data.encode("ascii").translate(_B64_TR))
+    return raw.decode("utf-8", errors="replace")
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Check whether a Gmail API error is a retryable rate-limit response"""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status == 429:
+        return True
+    details = error.error_details if isinstance(error.error_details, list) else []
+    reasons = {d.get("reason") for d in details if isinstance(d, dict)}
+    return error.resp.status == 403 and bool(reasons & RATE_LIMIT_REASONS)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header on a Gmail API error, if present"""
+    resp = getattr(error, "resp", None)
+    value = resp.get("retry-after") if resp is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AdaptiveRateController:
+    """
+    Batch size and backoff shared by one client's concurrent Gmail requests
+
+    Each rate-limit response halves the batch size (down to MIN_BATCH_SIZE)
+    and lengthens the next backoff. After BATCH_RECOVERY_SUCCESSES clean
+    responses in a row the batch size doubles again, up to BATCH_SIZE.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batch_size = BATCH_SIZE
+        self._successes = 0
+        self._rate_limits = 0
+
+    def on_success(self):
+        """Record a response that was not rate limited"""
+        with self._lock:
+            self._rate_limits = 0
+            self._successes += 1
+            if self._successes >= BATCH_RECOVERY_SUCCESSES:
+                self._successes = 0
+                self.batch_size = min(BATCH_SIZE, self.batch_size * 2)
+
+    def on_rate_limit(self, retry_after: Optional[float] = None) -> float:
+        """
+        Record a rate-limit response and return how long to wait
+
+        Args:
+            retry_after: Server-requested delay in seconds, if any
+
+        Returns:
+            Seconds to sleep before retrying
+        """
+        with self._lock:
+            self._successes = 0
+            self.batch_size = max(MIN_BATCH_SIZE, self.batch_size // 2)
+            delay = min(MAX_BACKOFF_SECONDS, 2**self._rate_limits + random.random())
+            self._rate_limits += 1
+        if retry_after is not None:
+            delay = min(MAX_BACKOFF_SECONDS, max(delay, retry_after))
+        return delay
 
 
 class GmailAPI:
@@ -35,90 +274,313 @@ class GmailAPI:
         data_dir = os.environ.get("ORBCOMM_DATA_DIR", str(Path.home() / ".orbcomm"))
         self.config_dir = Path(data_dir) / f"inbox{inbox_number}"
         self.token_file = self.config_dir / "token.json"
+        self.creds = None
         self.service = None
+        # Idle keep-alive connections for batch requests, reused across
+        # chunks and syncs so each one pays the TLS handshake only once
+        self._http_pool: "queue.SimpleQueue[httplib2.Http]" = queue.SimpleQueue()
+        # Adapts batch size and backoff to Gmail rate limiting across syncs
+        self.rate = AdaptiveRateController()
         self._authenticate()
 
     def _authenticate(self):
-        """Authenticate with Gmail API, refreshing token if expired"""
+        """Authenticate with Gmail API, reusing cached credentials while fresh"""
         if not self.token_file.exists():
             raise FileNotFoundError(
                 f"Inbox {self.inbox_number} not authenticated. "
                 f"Run: ./venv/bin/python3 setup_gmail_auth.py --inbox {self.inbox_number}"
             )
 
-        creds = Credentials.from_authorized_user_file(str(self.token_file), SCOPES)
-
-        # Refresh token if expired
-        if creds.expired and creds.refresh_token:
-            logger.info(f"Refreshing expired token for inbox {self.inbox_number}")
-            creds.refresh(Request())
-            # Save refreshed token
-            with open(self.token_file, "w") as f:
-                f.write(creds.to_json())
-            logger.info(f"Token refreshed and saved for inbox {self.inbox_number}")
+        cache_key = str(self.token_file)
+        with _token_cache_lock:
+            creds = _token_cache.get(cache_key)
+            if creds is None or not _is_fresh(creds):
+                creds = _load_credentials(self.token_file)
+                _token_cache[cache_key] = creds
 
+        self.creds = creds
         self.service = build("gmail", "v1", credentials=creds)
         logger.info(f"Authenticated inbox {self.inbox_number}")
+        _schedule_refresh(self.token_file, creds)
+
+    def close(self):
+        """Stop the background token refresh for this inbox"""
+        cancel_token_refresh(self.token_file)
 
     def fetch_new_emails(
-        self, since_date: Optional[datetime] = None, max_results: int = 100
+        self,
+        since_date: Optional[datetime] = None,
+        max_results: Optional[int] = None,
+        paginate: bool = True,
     ) -> List[Dict]:
         """
         Fetch new ORBCOMM notification emails
 
         Args:
             since_date: Only fetch emails after this date (None = last 7 days)
-            max_results: Maximum number of emails to fetch
+            max_results: Maximum number of emails to fetch (None = no limit)
+            paginate: Follow nextPageToken until max_results or the last page;
+                if False, only the first page of results is returned
 
         Returns:
             List of email dictionaries with full content
         """
-        if since_date is None:
-            # Default: last 7 days
-            since_date = datetime.now() - timedelta(days=7)
+        message_ids = self.list_message_ids(since_date, max_results, paginate)
+        return self.fetch_emails(message_ids)
+
+    def list_message_ids(
+        self,
+        since_date: Optional[datetime] = None,
+        max_results: Optional[int] = None,
+        paginate: bool = True,
+        after_timestamp: Optional[int] = None,
+    ) -> List[str]:
+        """
+        List IDs of ORBCOMM notification emails without fetching content
 
-        # Format date for Gmail query (YYYY/MM/DD)
-        date_str = since_date.strftime("%Y/%m/%d")
-        query = f"{SEARCH_QUERY} after:{date_str}"
+        Args:
+            since_date: Only list emails after this date (None = last 7 days)
+            max_results: Maximum number of IDs to return (None = no limit)
+            paginate: Follow nextPageToken until max_results or the last page
+            after_timestamp: Only list emails after this Unix time in seconds;
+                takes precedence over since_date
+
+        Returns:
+            List of Gmail message IDs
+        """
+        if after_timestamp is not None:
+            query = f"{SEARCH_QUERY} after:{after_timestamp}"
+        else:
+            if since_date is None:
+                # Default: last 7 days
+                since_date = datetime.now() - timedelta(days=7)
+
+            # Format date for Gmail query (YYYY/MM/DD)
+            date_str = since_date.strftime("%Y/%m/%d")
+            query = f"{SEARCH_QUERY} after:{date_str}"
 
         logger.info(f"Fetching emails with query: {query}")
 
         try:
-            # Get message IDs
-            results = (
+            messages = self._list_messages(query, max_results, paginate)
+        except Exception as e:
+            logger.error(f"Error listing emails: {e}")
+            raise
+
+        logger.info(f"Found {len(messages)} matching emails")
+        return [msg["id"] for msg in messages]
+
+    def fetch_emails(self, message_ids: List[str]) -> List[Dict]:
+        """
+        Fetch and extract content for specific messages
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Returns:
+            List of email dictionaries with full content, in message_ids order
+        """
+        if not message_ids:
+            logger.info("No new emails found")
+            return []
+
+        return [
+            email for batch in self.iter_email_batches(message_ids) for email in batch
+        ]
+
+    def iter_email_batches(self, message_ids: List[str]) -> Iterator[List[Dict]]:
+        """
+        Fetch and extract content for specific messages, one batch at a time
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Yields:
+            Lists of up to BATCH_SIZE email dictionaries, in message_ids order
+        """
+        try:
+            # Fetch content in batch requests instead of one GET per message
+            for messages in self._iter_message_batches(message_ids):
+                yield [self._extract_email_content(msg) for msg in messages]
+
+        except Exception as e:
+            logger.error(f"Error fetching emails: {e}")
+            raise
+
+    def _list_messages(
+        self, query: str, max_results: Optional[int], paginate: bool
+    ) -> List[Dict]:
+        """
+        List message stubs matching a query, following nextPageToken
+
+        Args:
+            query: Gmail search query
+            max_results: Maximum number of messages to return (None = no limit)
+            paginate: Whether to request pages beyond the first
+
+        Returns:
+            List of {'id'} message stubs
+        """
+        messages = []
+        page_token = None
+
+        while True:
+            page_size = LIST_PAGE_SIZE
+            if max_results is not None:
+                page_size = min(page_size, max_results - len(messages))
+
+            results = self._execute_with_retry(
                 self.service.users()
                 .messages()
-                .list(userId="me", q=query, maxResults=max_results)
-                .execute()
+                .list(
+                    userId="me",
+                    q=query,
+                    maxResults=page_size,
+                    pageToken=page_token,
+                    fields=LIST_FIELDS,
+                )
             )
+            messages.extend(results.get("messages", []))
+            page_token = results.get("nextPageToken")
 
-            messages = results.get("messages", [])
+            if not paginate or not page_token:
+                break
+            if max_results is not None and len(messages) >= max_results:
+                break
 
-            if not messages:
-                logger.info("No new emails found")
-                return []
+        return messages
 
-            logger.info(f"Found {len(messages)} new emails")
+    def _execute_with_retry(self, request) -> Dict:
+        """
+        Execute a single API request, backing off on rate-limit responses
+
+        Args:
+            request: googleapiclient HttpRequest
 
-            # Fetch full content for each message
-            emails = []
-            for msg in messages:
-                msg_id = msg["id"]
-                full_msg = (
+        Returns:
+            Parsed JSON response
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                result = request.execute()
+            except HttpError as e:
+                if not _is_rate_limited(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                delay = self.rate.on_rate_limit(_retry_after(e))
+                logger.warning(f"Rate limited, retrying in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                self.rate.on_success()
+                return result
+
+    def _iter_message_batches(self, message_ids: List[str]) -> Iterator[List[Dict]]:
+        """
+        Yield full messages one Gmail batch request at a time
+
+        Batches are sized by the rate controller when they are submitted and
+        executed concurrently, with at most MAX_BATCH_WORKERS in flight ahead
+        of the consumer.
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Yields:
+            Raw Gmail API message responses per batch, in message_ids order
+        """
+        if len(message_ids) <= self.rate.batch_size:
+            if message_ids:
+                yield self._execute_batch(message_ids)
+            return
+
+        with ThreadPoolExecutor(max_workers=MAX_BATCH_WORKERS) as executor:
+            in_flight = deque()
+            start = 0
+            while start < len(message_ids):
+                chunk = message_ids[start : start + self.rate.batch_size]
+                start += len(chunk)
+                in_flight.append(executor.submit(self._execute_batch, chunk))
+                if len(in_flight) >= MAX_BATCH_WORKERS:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def _execute_batch(self, message_ids: List[str]) -> List[Dict]:
+        """
+        Fetch one batch of full messages, retrying rate-limited sub-requests
+
+        Args:
+            message_ids: Up to BATCH_SIZE Gmail message IDs
+
+        Returns:
+            Raw Gmail API message responses, in the same order as message_ids
+        """
+        responses = {}
+        pending = list(message_ids)
+
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            failed = {}
+
+            def callback(request_id, response, exception):
+                if exception is not None:
+                    failed[request_id] = exception
+                else:
+                    responses[request_id] = response
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for msg_id in pending:
+                batch.add(
                     self.service.users()
                     .messages()
-                    .get(userId="me", id=msg_id, format="full")
-                    .execute()
+                    .get(userId="me", id=msg_id, format="full", fields=MESSAGE_FIELDS),
+                    request_id=msg_id,
                 )
+            with self._pooled_http() as http:
+                batch.execute(http=http)
 
-                email_data = self._extract_email_content(full_msg)
-                emails.append(email_data)
+            if not failed:
+                self.rate.on_success()
+                break
 
-            return emails
+            fatal = [e for e in failed.values() if not _is_rate_limited(e)]
+            if fatal or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise (fatal or list(failed.values()))[0]
 
-        except Exception as e:
-            logger.error(f"Error fetching emails: {e}")
-            raise
+            # Back off (honouring Retry-After) before retrying only the failures
+            retry_after = max(
+                (_retry_after(e) or 0 for e in failed.values()), default=0
+            )
+            delay = self.rate.on_rate_limit(retry_after or None)
+            logger.warning(
+                f"Rate limited on {len(failed)} messages, retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            pending = list(failed)
+
+        return [responses[msg_id] for msg_id in message_ids]
+
+    @contextmanager
+    def _pooled_http(self):
+        """
+        Borrow an authorized HTTP transport from the connection pool
+
+        httplib2 connections are not thread-safe, so each concurrent batch
+        holds its own until it finishes. Yields None (use the service
+        default) without creds.
+        """
+        if self.creds is None:
+            yield None
+            return
+
+        try:
+            conn = self._http_pool.get_nowait()
+        except queue.Empty:
+            # build_http applies the client's socket timeout and 308 handling,
+            # so a stalled batch call fails instead of hanging the sync
+            conn = build_http()
+        try:
+            yield AuthorizedHttp(self.creds, http=conn)
+        finally:
+            self._http_pool.put(conn)
 
     def _extract_email_content(self, message_data: Dict) -> Dict:
         """
@@ -130,32 +592,26 @@ class GmailAPI:
         Returns:
             Dictionary with extracted email content
         """
-        headers = message_data["payload"]["headers"]
-
-        # Extract headers
-        subject = ""
-        date_received = ""
-        for header in headers:
-            if header["name"] == "Subject":
-                subject = header["value"]
-            elif header["name"] == "Date":
-                date_received = header["value"]
+        headers = _extract_headers(message_data["payload"]["headers"])
+        subject = headers.get("Subject", "")
+        date_received = headers.get("Date", "")
 
         # Extract body
         body = ""
-        if "parts" in message_data["payload"]:
-            for part in message_data["payload"]["parts"]:
-                if part["mimeType"] == "text/plain":
-                    if "data" in part["body"]:
-                        body = base64.urlsafe_b64decode(part["body"]["data"]).decode(
-                            "utf-8"
-                        )
-                        break
-        else:
-            if "data" in message_data["payload"]["body"]:
-                body = base64.urlsafe_b64decode(
-                    message_data["payload"]["body"]["data"]
-                ).decode("utf-8")
+        payload = message_data["payload"]
+        if "parts" in payload:
+            data = next(
+                (
+                    part["body"]["data"]
+                    for part in payload["parts"]
+                    if part["mimeType"] == "text/plain" and "data" in part["body"]
+                ),
+                None,
+            )
+            if data is not None:
+                body = _decode_body(data)
+        elif "data" in payload["body"]:
+            body = _decode_body(payload["body"]["data"])
 
         return {
             "message_id": message_data["id"],
@@ -163,6 +619,7 @@ class GmailAPI:
             "subject": subject,
             "body": body,
             "date_received": date_received,
+            "internal_date": int(message_data.get("internalDate", 0)),
             "inbox_number": self.inbox_number,
         }
 
@@ -183,11 +640,10 @@ class GmailAPI:
         query = f"{SEARCH_QUERY} after:{date_str}"
 
         try:
-            results = (
+            results = self._execute_with_retry(
                 self.service.users()
                 .messages()
-                .list(userId="me", q=query, maxResults=1)
-                .execute()
+                .list(userId="me", q=query, maxResults=1, fields="resultSizeEstimate")
             )
 
             # Gmail returns resultSizeEstimate for total count
@@ -0,0 +1,46 @@
+"""
+Typed row models for ORBCOMM Service Tracker
+Compact, slotted alternatives to the dict rows returned by Database
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass(slots=True, frozen=True)
+class Notification:
+    """A single row of the notifications table"""
+
+    id: int
+    reference_number: str
+    gmail_message_id: str
+    thread_id: Optional[str]
+    inbox_source: Optional[str]
+    date_received: str
+    date_received_ts: Optional[int]
+    time_received: Optional[str]
+    date_parsed: Optional[str]
+    last_updated: Optional[str]
+    platform: Optional[str]
+    event_type: str
+    status: Optional[str]
+    priority: Optional[str]
+    scheduled_date: Optional[str]
+    scheduled_time: Optional[str]
+    duration: Optional[str]
+    affected_services: Optional[str]
+    summary: str
+    raw_email_body: Optional[str]
+    raw_email_subject: Optional[str]
+    resolution_date: Optional[str]
+    resolution_time: Optional[str]
+    time_to_resolve_minutes: Optional[int]
+    incident_start_time: Optional[str]
+    incident_end_time: Optional[str]
+    incident_duration_minutes: Optional[int]
+    is_archived: Optional[int]
+    notes: Optional[str]
+
+
+# Column list matching Notification's positional field order
+NOTIFICATION_COLUMNS = ", ".join(f.name for f in fields(Notification))
@@ -3,11 +3,15 @@ Monitoring and Health Check Module for ORBCOMM Service Tracker
 Provides health checks, metrics, and monitoring endpoints
 """
 
+import logging
 import os
+import sqlite3
+import threading
 import time
 from datetime import datetime
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, NamedTuple, Optional
 
 import psutil
 from flask import Response, jsonify
@@ -15,26 +19,160 @@ from flask import Response, jsonify
 try:
     from prometheus_client import (
         CONTENT_TYPE_LATEST,
+        CollectorRegistry,
         Counter,
         Gauge,
         Histogram,
         generate_latest,
+        multiprocess,
     )
 
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Seconds to reuse component check results; probes poll far more often
+HEALTH_CACHE_TTL = 10
+
+# Seconds a memory/disk snapshot is shared between health checks and metrics
+SYSTEM_SNAPSHOT_INTERVAL = 2
+
+# Seconds to serve the same /metrics payload to back-to-back scrapes
+METRICS_CACHE_TTL = 1
+
+# Seconds between system resource gauge refreshes
+SYSTEM_METRICS_INTERVAL = 15
+
+# Seconds between full PRAGMA integrity_check runs
+DB_INTEGRITY_CHECK_INTERVAL = int(os.environ.get("DB_INTEGRITY_CHECK_INTERVAL", "3600"))
+
+
+def ttl_cache(ttl: float, failure_ttl: Optional[float] = None):
+    """
+    Memoize a function's result per set of arguments for ttl seconds
+
+    With failure_ttl, results whose "status" is not "healthy" are kept only
+    that long, so a transient failure is re-checked soon.
+    """
+
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+
+            result = func(*args, **kwargs)
+            expires = now + ttl
+            if failure_ttl is not None and result.get("status") != "healthy":
+                expires = now + failure_ttl
+            with lock:
+                cache[key] = (expires, result)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def _snapshot_bucket() -> int:
+    """Current SYSTEM_SNAPSHOT_INTERVAL time bucket"""
+    return int(time.monotonic() // SYSTEM_SNAPSHOT_INTERVAL)
+
+
+class _MemoryUsage(NamedTuple):
+    """The psutil.virtual_memory() fields read by health checks and metrics"""
+
+    total: int
+    available: int
+    used: int
+    percent: float
+
+
+def _meminfo_bytes(data: bytes, name: bytes) -> Optional[int]:
+    """Value of one "Name:   123 kB" line of /proc/meminfo, in bytes"""
+    start = data.find(name)
+    if start < 0:
+        return None
+    end = data.find(b"\n", start)
+    return int(data[start + len(name) : end].split()[0]) * 1024
+
+
+def _read_meminfo() -> Optional[_MemoryUsage]:
+    """Memory usage straight from /proc/meminfo; None off Linux or on old kernels"""
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    total = _meminfo_bytes(data, b"MemTotal:")
+    available = _meminfo_bytes(data, b"MemAvailable:")
+    if not total or available is None:
+        return None
+
+    used = total - available
+    return _MemoryUsage(total, available, used, round(used / total * 100, 1))
+
+
+@lru_cache(maxsize=1)
+def _memory_snapshot(bucket: int):
+    """Memory usage, taken at most once per bucket (psutil off Linux)"""
+    return _read_meminfo() or psutil.virtual_memory()
+
+
+@lru_cache(maxsize=8)
+def _disk_snapshot(path: str, bucket: int):
+    """psutil.disk_usage(path), taken at most once per path and bucket"""
+    return psutil.disk_usage(path)
+
+
+def json_response(payload: Dict[str, Any], status: int = 200):
+    """JSON response for probe endpoints, encoded with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return Response(
+            orjson.dumps(payload), status=status, mimetype="application/json"
+        )
+    return jsonify(payload), status
+
 
 class HealthCheck:
     """Health check utilities for the application"""
 
     @staticmethod
+    def ping_database(db_path: str) -> bool:
+        """Cheap readiness probe: the notifications table is reachable"""
+        try:
+            conn = sqlite3.connect(db_path, timeout=5)
+            try:
+                conn.execute("SELECT 1 FROM notifications LIMIT 1").fetchall()
+            finally:
+                conn.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    @ttl_cache(HEALTH_CACHE_TTL)
     def check_database(db_path: str) -> Dict[str, Any]:
         """Check database connectivity and health"""
         try:
-            import sqlite3
-
             conn = sqlite3.connect(db_path, timeout=5)
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM notifications")
@@ -54,10 +192,65 @@ class HealthCheck:
             }
 
     @staticmethod
+    @ttl_cache(DB_INTEGRITY_CHECK_INTERVAL, failure_ttl=HEALTH_CACHE_TTL)
+    def check_integrity(db_path: str) -> Dict[str, Any]:
+        """
+        Run PRAGMA integrity_check, attempting a WAL checkpoint repair on failure
+
+        Args:
+            db_path: Path to SQLite database
+
+        Returns:
+            Check result dictionary
+        """
+        try:
+            conn = sqlite3.connect(db_path, timeout=5)
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchall()
+                repaired = False
+                if result != [("ok",)]:
+                    logger.error(
+                        f"Database integrity check failed for {db_path}: {result[:5]}"
+                    )
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+                    result = conn.execute("PRAGMA integrity_check").fetchall()
+                    repaired = result == [("ok",)]
+            finally:
+                conn.close()
+
+            is_ok = result == [("ok",)]
+            metrics.record_integrity(is_ok)
+            if repaired:
+                logger.warning(
+                    f"Database integrity restored by WAL checkpoint: {db_path}"
+                )
+
+            if is_ok:
+                message = "Integrity check passed"
+                if repaired:
+                    message += " after WAL checkpoint"
+            else:
+                message = f"Integrity check failed: {result[0][0]}"
+
+            return {
+                "status": "healthy" if is_ok else "unhealthy",
+                "message": message,
+                "repaired": repaired,
+            }
+        except Exception as e:
+            metrics.record_integrity(False)
+            return {
+                "status": "unhealthy",
+                "message": f"Integrity check error: {str(e)}",
+                "repaired": False,
+            }
+
+    @staticmethod
+    @ttl_cache(HEALTH_CACHE_TTL)
     def check_disk_space(data_dir: str, threshold_percent: int = 90) -> Dict[str, Any]:
         """Check available disk space"""
         try:
-            usage = psutil.disk_usage(data_dir)
+            usage = _disk_snapshot(data_dir, _snapshot_bucket())
             is_healthy = usage.percent < threshold_percent
 
             return {
@@ -75,10 +268,11 @@ class HealthCheck:
             }
 
     @staticmethod
+    @ttl_cache(HEALTH_CACHE_TTL)
     def check_memory(threshold_percent: int = 90) -> Dict[str, Any]:
         """Check memory usage"""
         try:
-            memory = psutil.virtual_memory()
+            memory = _memory_snapshot(_snapshot_bucket())
             is_healthy = memory.percent < threshold_percent
 
             return {
@@ -166,14 +360,36 @@ class Metrics:
             ["operation"],
         )
 
+        # Gauge modes only apply under PROMETHEUS_MULTIPROC_DIR, where every
+        # worker reports the same system-wide values
         self.notification_count = Gauge(
-            "orbcomm_notifications_total", "Total number of notifications", ["status"]
+            "orbcomm_notifications_total",
+            "Total number of notifications",
+            ["status"],
+            multiprocess_mode="livemax",
+        )
+
+        self.db_integrity_ok = Gauge(
+            "orbcomm_db_integrity_ok",
+            "1 if the last PRAGMA integrity_check passed, 0 otherwise",
+            multiprocess_mode="livemin",
         )
 
         # System metrics
-        self.memory_usage = Gauge("orbcomm_memory_usage_bytes", "Memory usage in bytes")
+        self.memory_usage = Gauge(
+            "orbcomm_memory_usage_bytes",
+            "Memory usage in bytes",
+            multiprocess_mode="livemax",
+        )
 
-        self.disk_usage = Gauge("orbcomm_disk_usage_percent", "Disk usage percentage")
+        self.disk_usage = Gauge(
+            "orbcomm_disk_usage_percent",
+            "Disk usage percentage",
+            multiprocess_mode="livemax",
+        )
+
+        self._system_thread = None
+        self._system_thread_lock = threading.Lock()
 
     def record_request(self, method: str, endpoint: str, status: int, duration: float):
         """Record HTTP request metrics"""
@@ -193,17 +409,56 @@ class Metrics:
             inbox=inbox, status="success" if success else "failure"
         ).inc(parsed)
 
+    def record_integrity(self, ok: bool):
+        """Record the outcome of a database integrity check"""
+        if not PROMETHEUS_AVAILABLE:
+            return
+
+        self.db_integrity_ok.set(1 if ok else 0)
+
     def update_system_metrics(self):
         """Update system resource metrics"""
         if not PROMETHEUS_AVAILABLE:
             return
 
-        memory = psutil.virtual_memory()
+        bucket = _snapshot_bucket()
+        memory = _memory_snapshot(bucket)
         self.memory_usage.set(memory.used)
 
-        disk = psutil.disk_usage("/")
+        disk = _disk_snapshot("/", bucket)
         self.disk_usage.set(disk.percent)
 
+    def start_system_metrics_thread(self, interval: float = SYSTEM_METRICS_INTERVAL):
+        """Refresh system resource metrics in a daemon thread, once per process"""
+        if not PROMETHEUS_AVAILABLE:
+            return
+
+        with self._system_thread_lock:
+            if self._system_thread is not None:
+                return
+
+            def run():
+                while True:
+                    try:
+                        self.update_system_metrics()
+                    except Exception:
+                        logger.exception("Error updating system metrics")
+                    time.sleep(interval)
+
+            self._system_thread = threading.Thread(
+                target=run, name="system-metrics", daemon=True
+            )
+            self._system_thread.start()
+
+    @ttl_cache(METRICS_CACHE_TTL)
+    def generate(self) -> bytes:
+        """Render metrics, aggregating all Gunicorn workers in multiprocess mode"""
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest()
+
 
 # Global metrics instance
 metrics = Metrics()
@@ -211,19 +466,18 @@ metrics = Metrics()
 
 def register_health_routes(app, db_path: str, data_dir: str):
     """Register health check and monitoring routes to Flask app"""
+    metrics.start_system_metrics_thread()
 
     @app.route("/health")
     def health_check():
         """Basic health check endpoint"""
-        return (
-            jsonify(
-                {
-                    "status": "healthy",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "service": "ORBCOMM Service Tracker",
-                    "version": "1.1.0",
-                }
-            ),
+        return json_response(
+            {
+                "status": "healthy",
+                "timestamp": datetime.utcnow().isoformat(),
+                "service": "ORBCOMM Service Tracker",
+                "version": "1.1.0",
+            },
             200,
         )
 
@@ -232,6 +486,7 @@ def register_health_routes(app, db_path: str, data_dir: str):
         """Detailed health check with component status"""
         checks = {
             "database": HealthCheck.check_database(db_path),
+            "integrity": HealthCheck.check_integrity(db_path),
             "disk": HealthCheck.check_disk_space(data_dir),
             "memory": HealthCheck.check_memory(),
             "credentials": HealthCheck.check_credentials(data_dir),
@@ -242,15 +497,13 @@ def register_health_routes(app, db_path: str, data_dir: str):
             check["status"] != "unhealthy" for check in checks.values()
         )
 
-        return (
-            jsonify(
-                {
-                    "status": "healthy" if overall_healthy else "unhealthy",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "checks": checks,
-                    "uptime_seconds": time.process_time(),
-                }
-            ),
+        return json_response(
+            {
+                "status": "healthy" if overall_healthy else "unhealthy",
+                "timestamp": datetime.utcnow().isoformat(),
+                "checks": checks,
+                "uptime_seconds": time.process_time(),
+            },
             200 if overall_healthy else 503,
         )
 
@@ -259,65 +512,55 @@ def register_health_routes(app, db_path: str, data_dir: str):
         """Kubernetes readiness probe"""
         try:
             # Check if database is accessible
-            db_check = HealthCheck.check_database(db_path)
-            is_ready = db_check["status"] == "healthy"
+            is_ready = HealthCheck.ping_database(db_path)
 
-            return (
-                jsonify(
-                    {"ready": is_ready, "timestamp": datetime.utcnow().isoformat()}
-                ),
+            return json_response(
+                {"ready": is_ready, "timestamp": datetime.utcnow().isoformat()},
                 200 if is_ready else 503,
             )
         except Exception as e:
-            return (
-                jsonify(
-                    {
-                        "ready": False,
-                        "error": str(e),
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-                ),
+            return json_response(
+                {
+                    "ready": False,
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
                 503,
             )
 
     @app.route("/health/live")
     def liveness_check():
         """Kubernetes liveness probe"""
-        return jsonify({"alive": True, "timestamp": datetime.utcnow().isoformat()}), 200
+        return json_response(
+            {"alive": True, "timestamp": datetime.utcnow().isoformat()}, 200
+        )
 
     @app.route("/metrics")
     def prometheus_metrics():
         """Prometheus metrics endpoint"""
         if not PROMETHEUS_AVAILABLE:
-            return (
-                jsonify(
-                    {
-                        "error": "Prometheus client not available",
-                        "message": "Install prometheus-client package",
-                    }
-                ),
+            return json_response(
+                {
+                    "error": "Prometheus client not available",
+                    "message": "Install prometheus-client package",
+                },
                 501,
             )
 
-        # Update system metrics before generating output
-        metrics.update_system_metrics()
-
-        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+        return Response(metrics.generate(), mimetype=CONTENT_TYPE_LATEST)
 
     @app.route("/info")
     def app_info():
         """Application information endpoint"""
-        return (
-            jsonify(
-                {
-                    "name": "ORBCOMM Service Tracker",
-                    "version": "1.1.0",
-                    "description": "Email notification monitoring and analytics",
-                    "environment": os.environ.get("FLASK_ENV", "production"),
-                    "python_version": os.sys.version,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-            ),
+        return json_response(
+            {
+                "name": "ORBCOMM Service Tracker",
+                "version": "1.1.0",
+                "description": "Email notification monitoring and analytics",
+                "environment": os.environ.get("FLASK_ENV", "production"),
+                "python_version": os.sys.version,
+                "timestamp": datetime.utcnow().isoformat(),
+            },
             200,
         )
 
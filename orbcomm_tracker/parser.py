@@ -4,15 +4,10 @@ Parses emails and stores directly to database
 """
 
 import logging
-import sys
-from pathlib import Path
 from typing import Dict, Optional
 
-# Add parent directory to path for importing orbcomm_processor
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from orbcomm_processor import SimpleORBCOMMParser  # noqa: E402
-from orbcomm_tracker.database import Database  # noqa: E402
+from orbcomm_processor import SimpleORBCOMMParser
+from orbcomm_tracker.database import REQUIRED_NOTIFICATION_FIELDS, Database
 
 logger = logging.getLogger(__name__)
 
@@ -30,40 +25,50 @@ class ORBCOMMParser:
         self.db = db
         self.parser = SimpleORBCOMMParser()
 
-    def parse_and_store(self, email_data: Dict, inbox_source: str) -> Optional[int]:
+    def _build_notification(self, email_data: Dict, inbox_source: str) -> Dict:
+        """Parse an email into a notification row with its Gmail metadata"""
+        # Parse email using SimpleORBCOMMParser
+        parsed = self.parser.parse_text(
+            text=email_data["body"],
+            subject=email_data["subject"],
+            email_date=email_data.get("date_received"),
+        )
+
+        # Add Gmail metadata
+        parsed["gmail_message_id"] = email_data["message_id"]
+        parsed["thread_id"] = email_data["thread_id"]
+        parsed["inbox_source"] = inbox_source
+        parsed["raw_email_body"] = email_data["body"]
+        parsed["raw_email_subject"] = email_data["subject"]
+        return parsed
+
+    def parse_and_store(
+        self, email_data: Dict, inbox_source: str, check_duplicate: bool = True
+    ) -> Optional[int]:
         """
         Parse email and store notification in database
 
         Args:
             email_data: Email dictionary from GmailAPI
             inbox_source: Source identifier (e.g., 'inbox2_continuous')
+            check_duplicate: Look up the Gmail message ID before storing;
+                callers that already filtered known IDs can skip this
 
         Returns:
             Notification ID if successful, None if duplicate or error
         """
         try:
-            # Parse email using SimpleORBCOMMParser
-            parsed = self.parser.parse_text(
-                text=email_data["body"],
-                subject=email_data["subject"],
-                email_date=email_data.get("date_received"),
-            )
+            parsed = self._build_notification(email_data, inbox_source)
 
             # Check if already imported (by Gmail message ID)
-            existing = self.db.get_notification_by_gmail_id(email_data["message_id"])
-            if existing:
+            if check_duplicate and self.db.get_notification_by_gmail_id(
+                email_data["message_id"]
+            ):
                 logger.debug(
                     f"Skipping duplicate: {parsed['reference_number']} (message_id: {email_data['message_id']})"
                 )
                 return None
 
-            # Add Gmail metadata
-            parsed["gmail_message_id"] = email_data["message_id"]
-            parsed["thread_id"] = email_data["thread_id"]
-            parsed["inbox_source"] = inbox_source
-            parsed["raw_email_body"] = email_data["body"]
-            parsed["raw_email_subject"] = email_data["subject"]
-
             # Store in database
             notif_id = self.db.insert_notification(parsed)
 
@@ -95,16 +100,42 @@ class ORBCOMMParser:
         """
         counts = {"stored": 0, "duplicates": 0, "errors": 0}
 
-        for email_data in emails:
+        # Resolve duplicates with one query rather than a lookup per email
+        known_ids = self.db.get_existing_gmail_ids(
+            [email_data["message_id"] for email_data in emails]
+        )
+        new_emails = [e for e in emails if e["message_id"] not in known_ids]
+        counts["duplicates"] = len(emails) - len(new_emails)
+
+        rows = []
+        for email_data in new_emails:
             try:
-                notif_id = self.parse_and_store(email_data, inbox_source)
-                if notif_id:
-                    counts["stored"] += 1
-                else:
-                    counts["duplicates"] += 1
+                row = self._build_notification(email_data, inbox_source)
             except Exception as e:
                 logger.error(f"Error processing email: {e}")
                 counts["errors"] += 1
+                continue
+
+            missing = [f for f in REQUIRED_NOTIFICATION_FIELDS if row.get(f) is None]
+            if missing:
+                logger.error(
+                    f"Skipping email {email_data['message_id']}: missing {', '.join(missing)}"
+                )
+                counts["errors"] += 1
+                continue
+            rows.append(row)
+
+        # Store the whole batch in one transaction
+        result = self.db.insert_notifications_many(rows)
+        if result is None:
+            counts["errors"] += len(rows)
+        else:
+            # Rejected rows failed a constraint; only the rest were skipped
+            # by ON CONFLICT as already stored
+            stored, rejected = result
+            counts["stored"] += stored
+            counts["errors"] += rejected
+            counts["duplicates"] += len(rows) - stored - rejected
 
         return counts
 
@@ -135,27 +166,7 @@ class ORBCOMMParser:
             Number of pairs linked
         """
         try:
-            cursor = self.db.conn.cursor()
-
-            if inbox_source:
-                cursor.execute(
-                    """
-                    SELECT DISTINCT reference_number
-                    FROM notifications
-                    WHERE inbox_source = ?
-                """,
-                    (inbox_source,),
-                )
-            else:
-                cursor.execute("SELECT DISTINCT reference_number FROM notifications")
-
-            refs = [row[0] for row in cursor.fetchall()]
-
-            linked = 0
-            for ref in refs:
-                if self.link_pairs_for_reference(ref):
-                    linked += 1
-
+            linked = self.db.link_all_notification_pairs(inbox_source or None)
             logger.info(f"Linked {linked} notification pairs")
             return linked
 
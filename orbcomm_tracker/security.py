@@ -4,9 +4,12 @@ Includes rate limiting, authentication, and security headers
 """
 
 import hashlib
+import hmac
 import os
+import re
 from datetime import datetime
 from functools import wraps
+from typing import Optional
 
 from flask import jsonify, request, session
 
@@ -25,6 +28,12 @@ try:
 except ImportError:
     TALISMAN_AVAILABLE = False
 
+# Cost parameters for scrypt password hashes (~16 MB, well under a second)
+SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1}
+
+# Used with fullmatch: a "$" anchor would also accept a trailing newline
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
 
 class RateLimiter:
     """Rate limiting for API endpoints"""
@@ -114,13 +123,36 @@ class SimpleAuth:
         """Hash a password using SHA256"""
         return hashlib.sha256(password.encode()).hexdigest()
 
+    @staticmethod
+    def hash_password_scrypt(password: str, salt: Optional[bytes] = None) -> str:
+        """Hash a password using salted scrypt, as scrypt$<salt>$<key> hex"""
+        salt = salt or os.urandom(16)
+        key = hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+        return f"scrypt${salt.hex()}${key.hex()}"
+
+    def _password_matches(self, password: str) -> bool:
+        """Constant-time check of password against the configured hash"""
+        stored = self.password_hash
+        if stored.startswith("scrypt$"):
+            try:
+                _, salt_hex, _ = stored.split("$")
+                candidate = self.hash_password_scrypt(password, bytes.fromhex(salt_hex))
+            except ValueError:
+                return False
+        else:
+            candidate = self.hash_password(password)
+        return hmac.compare_digest(candidate.encode(), stored.encode())
+
     def verify_password(self, username: str, password: str) -> bool:
         """Verify username and password"""
         if not self.app.config.get("AUTH_ENABLED", False):
             return True
 
-        password_hash = self.hash_password(password)
-        return username == self.username and password_hash == self.password_hash
+        # Bitwise & so both comparisons always run
+        username_ok = hmac.compare_digest(
+            (username or "").encode(), self.username.encode()
+        )
+        return username_ok & self._password_matches(password or "")
 
     def login_required(self, f):
         """Decorator to require login for routes"""
@@ -187,10 +219,7 @@ class InputValidator:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Basic email validation"""
-        import re
-
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        return re.match(pattern, email) is not None
+        return EMAIL_PATTERN.fullmatch(email) is not None
 
     @staticmethod
     def validate_date(date_str: str) -> bool:
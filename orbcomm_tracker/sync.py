@@ -4,48 +4,91 @@ Coordinates Gmail API, parsing, and database operations
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional
 
-from orbcomm_tracker.database import Database
+from orbcomm_tracker.database import Database, close_shared_db, get_shared_db
 from orbcomm_tracker.gmail_api import GmailAPI
 from orbcomm_tracker.parser import ORBCOMMParser
 
 logger = logging.getLogger(__name__)
 
+# Seconds the Gmail query reaches back before the stored internalDate
+# high-water mark; already-stored messages are skipped by ID anyway
+HIGH_WATER_OVERLAP = 300
+
+# Fetched email batches allowed to wait for the parser before Gmail fetching
+# pauses
+PIPELINE_DEPTH = 4
+
 
 class SyncOrchestrator:
     """Coordinates email fetching, parsing, and storage"""
 
-    def __init__(self, inbox_number: int):
+    def __init__(self, inbox_number: int, db: Optional[Database] = None):
         """
         Initialize sync orchestrator
 
         Args:
             inbox_number: Inbox to sync (1 or 2)
+            db: Database handle to use (default: the calling thread's shared one)
         """
         self.inbox_number = inbox_number
         self.inbox_source = f"inbox{inbox_number}_continuous"
 
         # Initialize components
-        self.db = Database()
-        self.gmail = GmailAPI(inbox_number)
+        self._shared_db = db is None
+        self.db = get_shared_db() if self._shared_db else db
+        self._gmail = None
         self.parser = ORBCOMMParser(self.db)
 
+        # Config and last-sync reads, memoized until this orchestrator writes
+        self._cache: Dict[str, object] = {}
+
+    @property
+    def gmail(self) -> GmailAPI:
+        """Gmail client, authenticated on first use; DB-only operations skip it"""
+        if self._gmail is None:
+            self._gmail = GmailAPI(self.inbox_number)
+        return self._gmail
+
+    def _cached(self, key: str, load: Callable[[], object]) -> object:
+        """Return a memoized database read, loading it on first use"""
+        if key not in self._cache:
+            self._cache[key] = load()
+        return self._cache[key]
+
+    def _get_config(self, key: str, default=None):
+        """Memoized Database.get_config"""
+        value = self._cached(f"config:{key}", lambda: self.db.get_config(key))
+        return default if value is None else value
+
+    def _get_last_sync_date(self) -> Optional[datetime]:
+        """Memoized Database.get_last_sync_date for this inbox"""
+        return self._cached(
+            "last_sync", lambda: self.db.get_last_sync_date(self.inbox_source)
+        )
+
     def sync(self, since_date: Optional[datetime] = None, force: bool = False) -> Dict:
         """
         Execute sync operation
 
         Args:
             since_date: Fetch emails after this date (None = auto-detect from last sync)
-            force: If True, ignore historical_complete flag
+            force: If True, ignore historical_complete flag and the minimum
+                sync interval
 
         Returns:
             Dictionary with sync results
         """
+        # Pick up changes made by other processes since the last run
+        self._cache.clear()
+
         # Check if inbox is marked as historical_complete
         if not force:
-            is_historical_complete = self.db.get_config(
+            is_historical_complete = self._get_config(
                 f"inbox{self.inbox_number}_historical_complete", default="false"
             )
             if is_historical_complete == "true":
@@ -53,47 +96,88 @@ class SyncOrchestrator:
                     f"Inbox {self.inbox_number} marked as historical_complete, using continuous sync"
                 )
 
+        # Skip polling entirely when the last successful sync is too recent
+        if not force and since_date is None and self._throttled():
+            return {
+                "status": "skipped",
+                "emails_fetched": 0,
+                "emails_stored": 0,
+                "duplicates": 0,
+                "errors": 0,
+                "pairs_linked": 0,
+            }
+
+        # Authenticate before logging, so an unauthenticated inbox raises
+        # FileNotFoundError without leaving a failed sync record
+        gmail = self.gmail
+
         # Start sync logging
         sync_id = self.db.log_sync_start(self.inbox_source)
+        high_water_key = f"inbox{self.inbox_number}_last_internal_date"
 
         try:
             # Determine date range
+            after_timestamp = None
             if since_date is None:
-                # Get last successful sync date
-                last_sync = self.db.get_last_sync_date(self.inbox_source)
-                if last_sync:
-                    since_date = last_sync
-                    logger.info(f"Last sync: {last_sync.isoformat()}")
+                # Prefer the newest Gmail internalDate stored by a previous sync
+                high_water = self._get_config(high_water_key)
+                if high_water:
+                    after_timestamp = int(high_water) // 1000 - HIGH_WATER_OVERLAP
+                    logger.info(f"Fetching emails after internalDate {high_water}")
                 else:
-                    # First sync - default to last 7 days
-                    since_date = datetime.now() - timedelta(days=7)
-                    logger.info("First sync - fetching last 7 days")
+                    # Get last successful sync date
+                    last_sync = self._get_last_sync_date()
+                    if last_sync:
+                        since_date = last_sync
+                        logger.info(f"Last sync: {last_sync.isoformat()}")
+                    else:
+                        # First sync - default to last 7 days
+                        since_date = datetime.now() - timedelta(days=7)
+                        logger.info("First sync - fetching last 7 days")
 
             # Fetch emails
-            logger.info(f"Fetching emails since {since_date.isoformat()}")
-            emails = self.gmail.fetch_new_emails(since_date=since_date)
+            if since_date is not None:
+                logger.info(f"Fetching emails since {since_date.isoformat()}")
+            message_ids = gmail.list_message_ids(
+                since_date=since_date, after_timestamp=after_timestamp
+            )
+
+            # Only download bodies for messages not already stored
+            known_ids = self.db.get_existing_gmail_ids(message_ids)
+            new_ids = [msg_id for msg_id in message_ids if msg_id not in known_ids]
+            already_stored = len(message_ids) - len(new_ids)
+            if already_stored:
+                logger.info(f"Skipping {already_stored} already-stored emails")
 
-            if not emails:
+            if not new_ids:
                 logger.info("No new emails to process")
                 self.db.log_sync_complete(
                     sync_id=sync_id,
-                    emails_fetched=0,
+                    emails_fetched=len(message_ids),
                     emails_parsed=0,
                     errors_count=0,
                     status="success",
                 )
                 return {
                     "status": "success",
-                    "emails_fetched": 0,
+                    "emails_fetched": len(message_ids),
                     "emails_stored": 0,
-                    "duplicates": 0,
+                    "duplicates": already_stored,
                     "errors": 0,
                     "pairs_linked": 0,
                 }
 
-            # Parse and store
-            logger.info(f"Processing {len(emails)} emails")
-            counts = self.parser.parse_and_store_batch(emails, self.inbox_source)
+            # Parse and store each batch while the next ones are downloading
+            logger.info(f"Processing {len(new_ids)} emails")
+            counts = {"stored": 0, "duplicates": 0, "errors": 0}
+            newest = 0
+            for emails in self._stream_email_batches(new_ids):
+                batch_counts = self.parser.parse_and_store_batch(
+                    emails, self.inbox_source
+                )
+                for key in counts:
+                    counts[key] += batch_counts[key]
+                newest = max([newest] + [e.get("internal_date", 0) for e in emails])
 
             # Link notification pairs
             pairs_linked = 0
@@ -101,20 +185,28 @@ class SyncOrchestrator:
                 logger.info("Linking notification pairs...")
                 pairs_linked = self.parser.link_all_pairs(self.inbox_source)
 
-            # Log completion
+            # Advance the high-water mark only when nothing needs a retry
+            config = {}
+            if counts["errors"] == 0 and newest:
+                stored = int(self._get_config(high_water_key, default="0"))
+                if newest > stored:
+                    config[high_water_key] = str(newest)
+
+            # Log completion and the new high-water mark in one commit
             self.db.log_sync_complete(
                 sync_id=sync_id,
-                emails_fetched=len(emails),
+                emails_fetched=len(message_ids),
                 emails_parsed=counts["stored"],
                 errors_count=counts["errors"],
                 status="success" if counts["errors"] == 0 else "partial",
+                config=config,
             )
 
             result = {
                 "status": "success" if counts["errors"] == 0 else "partial",
-                "emails_fetched": len(emails),
+                "emails_fetched": len(message_ids),
                 "emails_stored": counts["stored"],
-                "duplicates": counts["duplicates"],
+                "duplicates": already_stored + counts["duplicates"],
                 "errors": counts["errors"],
                 "pairs_linked": pairs_linked,
             }
@@ -134,6 +226,91 @@ class SyncOrchestrator:
             )
             raise
 
+        finally:
+            # This run wrote sync history and possibly config
+            self._cache.clear()
+
+    def _throttled(self) -> bool:
+        """
+        Check the inbox's minimum sync interval against the last successful sync
+
+        Returns:
+            True if inbox{N}_min_interval_s is set and has not yet elapsed
+        """
+        interval = int(
+            self._get_config(f"inbox{self.inbox_number}_min_interval_s", default="0")
+        )
+        if interval <= 0:
+            return False
+
+        last_sync = self._get_last_sync_date()
+        if last_sync is None:
+            return False
+
+        # sync_history timestamps are SQLite CURRENT_TIMESTAMP (UTC)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        elapsed = (now - last_sync).total_seconds()
+        if elapsed >= interval:
+            return False
+
+        logger.info(
+            f"Inbox {self.inbox_number} synced {elapsed:.0f}s ago "
+            f"(minimum interval {interval}s), skipping"
+        )
+        return True
+
+    def _stream_email_batches(self, message_ids: List[str]) -> Iterator[List[Dict]]:
+        """
+        Yield email batches downloaded by a background producer thread
+
+        The queue is bounded by PIPELINE_DEPTH so a slow parser holds back
+        Gmail fetching. Database work stays on the calling thread.
+
+        Args:
+            message_ids: Gmail message IDs to fetch
+
+        Yields:
+            Lists of email dictionaries, in message_ids order
+        """
+        batches = queue.Queue(maxsize=PIPELINE_DEPTH)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for emails in self.gmail.iter_email_batches(message_ids):
+                    if not put(emails):
+                        return
+            except Exception as e:
+                put(e)
+            else:
+                put(done)
+
+        producer = threading.Thread(
+            target=produce, name=f"gmail-fetch-{self.inbox_number}", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
     def get_sync_status(self) -> Dict:
         """
         Get current sync status and statistics
@@ -141,7 +318,7 @@ class SyncOrchestrator:
         Returns:
             Dictionary with sync status information
         """
-        last_sync = self.db.get_last_sync_date(self.inbox_source)
+        last_sync = self._get_last_sync_date()
         stats = self.db.get_current_stats()
 
         return {
@@ -180,6 +357,16 @@ class SyncOrchestrator:
         return self.db.save_stats_snapshot()
 
     def close(self):
-        """Close database connection"""
-        if self.db:
-            self.db.close()
+        """
+        Release this orchestrator's Gmail client and database handle
+
+        Stops the inbox's background token refresh. Without an explicit db
+        this also closes the calling thread's shared Database (the next
+        orchestrator reopens it). A db passed in by the caller is left open
+        for the caller to close.
+        """
+        if self._gmail is not None:
+            self._gmail.close()
+            self._gmail = None
+        if self._shared_db:
+            close_shared_db()
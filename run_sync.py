@@ -7,12 +7,16 @@ Run this to manually sync ORBCOMM emails from inbox 2
 import argparse
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, List
 
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from orbcomm_tracker.database import close_shared_db, get_shared_db  # noqa: E402
 from orbcomm_tracker.sync import SyncOrchestrator  # noqa: E402
 
 # Configure logging
@@ -22,6 +26,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class Summary:
+    """Closing summary, filled in as each inbox sync finishes"""
+
+    lines: Dict[int, str] = field(default_factory=dict)
+    failed: List[int] = field(default_factory=list)
+
+    def add(self, inbox_num, result):
+        """Record a finished inbox; only its summary line is kept"""
+        self.lines[inbox_num] = (
+            f"Inbox {inbox_num}: {result['emails_fetched']} fetched, "
+            f"{result['emails_stored']} stored"
+        )
+
+    def fail(self, inbox_num):
+        """Record an inbox that could not be synced"""
+        self.failed.append(inbox_num)
+
+    def render(self) -> str:
+        """Summary block, in inbox order"""
+        out = ["=" * 70, "  Sync Summary", "=" * 70]
+        out.extend(line for _, line in sorted(self.lines.items()))
+        if self.failed:
+            out.append(f"Failed: {', '.join(map(str, sorted(self.failed)))}")
+        out.append("")
+        return "\n".join(out) + "\n"
+
+
+def _run_one(inbox_num, since_date, force):
+    """
+    Sync one inbox on a worker thread (with that thread's SQLite connection)
+
+    Returns:
+        (result, None) on success, (None, exception) on failure
+    """
+    sync = None
+    try:
+        sync = SyncOrchestrator(inbox_num)
+        return sync.sync(since_date=since_date, force=force), None
+    except Exception as e:
+        return None, e
+    finally:
+        # Stops the inbox's token refresh and closes the shared connection
+        if sync is not None:
+            sync.close()
+
+
+def _report(result, inbox_num):
+    """
+    Build the results block for one inbox as a single string
+
+    Written with one stdout call so concurrent inboxes never interleave.
+    """
+    lines = [
+        "-" * 70,
+        f"  Inbox {inbox_num} Sync Results",
+        "-" * 70,
+        f"Status:           {result['status'].upper()}",
+        f"Emails fetched:   {result['emails_fetched']}",
+        f"Emails stored:    {result['emails_stored']}",
+        f"Duplicates:       {result['duplicates']}",
+        f"Errors:           {result['errors']}",
+        f"Pairs linked:     {result['pairs_linked']}",
+        "",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _status_report(status, title):
+    """Build a database stats block (sync status or current stats) under the title"""
+    lines = [
+        title,
+        f"Total notifications:    {status['total_notifications']}",
+        f"Open:                   {status['open_count']}",
+        f"Resolved:               {status['resolved_count']}",
+        f"Avg resolution time:    {status['avg_resolution_time_minutes']:.1f} minutes",
+        "",
+    ]
+    return "\n".join(lines) + "\n"
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Sync ORBCOMM notifications from Gmail"
@@ -76,30 +161,23 @@ def main():
     print()
 
     try:
-        all_results = {}
-        failed_inboxes = []
+        summary = Summary()
 
-        # Status only mode
+        # Status only mode (database only; one connection for all inboxes)
         if args.status:
-            for inbox_num in inbox_numbers:
-                try:
-                    sync = SyncOrchestrator(inbox_num)
-                    status = sync.get_sync_status()
-                    print(f"📊 Inbox {inbox_num} Status")
-                    print("-" * 70)
-                    print(f"Source:                 {status['inbox_source']}")
-                    print(f"Last sync:              {status['last_sync'] or 'Never'}")
-                    print(f"Total notifications:    {status['total_notifications']}")
-                    print(f"Open:                   {status['open_count']}")
-                    print(f"Resolved:               {status['resolved_count']}")
-                    print(
-                        f"Avg resolution time:    {status['avg_resolution_time_minutes']:.1f} minutes"
+            db = get_shared_db()
+            try:
+                for inbox_num in inbox_numbers:
+                    status = SyncOrchestrator(inbox_num, db=db).get_sync_status()
+                    title = (
+                        f"📊 Inbox {inbox_num} Status\n"
+                        f"{'-' * 70}\n"
+                        f"Source:                 {status['inbox_source']}\n"
+                        f"Last sync:              {status['last_sync'] or 'Never'}"
                     )
-                    print()
-                    sync.close()
-                except FileNotFoundError:
-                    print(f"⚠️  Inbox {inbox_num} not authenticated")
-                    print()
+                    sys.stdout.write(_status_report(status, title))
+            finally:
+                close_shared_db()
             return 0
 
         # Determine since_date
@@ -111,97 +189,75 @@ def main():
             )
             print()
 
-        # Run sync for each inbox
+        # Run sync for all inboxes concurrently; each is I/O-bound on Gmail
         for inbox_num in inbox_numbers:
-            try:
-                print("=" * 70)
-                print(f"🔄 Starting sync for Inbox {inbox_num}...")
-                print("=" * 70)
-                print()
+            print(f"🔄 Starting sync for Inbox {inbox_num}...")
+        print()
+
+        with ThreadPoolExecutor(max_workers=len(inbox_numbers)) as executor:
+            futures = {
+                executor.submit(_run_one, inbox_num, since_date, args.force): inbox_num
+                for inbox_num in inbox_numbers
+            }
+
+            for future in as_completed(futures):
+                inbox_num = futures[future]
+                result, error = future.result()
 
-                sync = SyncOrchestrator(inbox_num)
-                result = sync.sync(since_date=since_date, force=args.force)
-                all_results[inbox_num] = result
+                if isinstance(error, FileNotFoundError):
+                    print(f"❌ Error: {error}")
+                    print(f"⚠️  Skipping inbox {inbox_num} - not authenticated")
+                    print()
+                    summary.fail(inbox_num)
+                    continue
+                if error is not None:
+                    logger.error(
+                        f"Inbox {inbox_num} sync failed: {error}", exc_info=error
+                    )
+                    print(f"❌ Inbox {inbox_num} sync failed: {error}")
+                    print()
+                    summary.fail(inbox_num)
+                    continue
+
+                summary.add(inbox_num, result)
 
                 # Display results
-                print()
-                print("-" * 70)
-                print(f"  Inbox {inbox_num} Sync Results")
-                print("-" * 70)
-                print(f"Status:           {result['status'].upper()}")
-                print(f"Emails fetched:   {result['emails_fetched']}")
-                print(f"Emails stored:    {result['emails_stored']}")
-                print(f"Duplicates:       {result['duplicates']}")
-                print(f"Errors:           {result['errors']}")
-                print(f"Pairs linked:     {result['pairs_linked']}")
-                print()
-
-                sync.close()
-
-            except FileNotFoundError as e:
-                print(f"❌ Error: {e}")
-                print(f"⚠️  Skipping inbox {inbox_num} - not authenticated")
-                print()
-                failed_inboxes.append(inbox_num)
-                continue
-            except Exception as e:
-                logger.error(f"Inbox {inbox_num} sync failed: {e}", exc_info=True)
-                print(f"❌ Inbox {inbox_num} sync failed: {e}")
-                print()
-                failed_inboxes.append(inbox_num)
-                continue
+                sys.stdout.write(_report(result, inbox_num))
 
         # If all inboxes failed, exit with error
-        if len(failed_inboxes) == len(inbox_numbers):
+        if len(summary.failed) == len(inbox_numbers):
             print("❌ All inboxes failed to sync")
             return 1
 
-        # Post-sync operations (using first successful inbox)
-        successful_inboxes = [i for i in inbox_numbers if i not in failed_inboxes]
+        # Post-sync operations (using first successful inbox; database only)
+        successful_inboxes = [i for i in inbox_numbers if i not in summary.failed]
         if successful_inboxes:
-            sync = SyncOrchestrator(successful_inboxes[0])
-
-            # Archive old notifications if requested
-            if args.archive:
-                print(f"📦 Archiving notifications older than {args.archive} days...")
-                archived = sync.archive_old_notifications(args.archive)
-                print(f"✅ Archived {archived} notifications")
-                print()
-
-            # Save stats snapshot if requested
-            if args.snapshot:
-                print("📸 Saving stats snapshot...")
-                sync.save_stats_snapshot()
-                print("✅ Snapshot saved")
-                print()
-
-            # Show current stats
-            status = sync.get_sync_status()
-            print("=" * 70)
-            print("  Current Database Stats")
-            print("=" * 70)
-            print(f"Total notifications:    {status['total_notifications']}")
-            print(f"Open:                   {status['open_count']}")
-            print(f"Resolved:               {status['resolved_count']}")
-            print(
-                f"Avg resolution time:    {status['avg_resolution_time_minutes']:.1f} minutes"
-            )
-            print()
+            try:
+                sync = SyncOrchestrator(successful_inboxes[0])
 
-            sync.close()
+                # Archive old notifications if requested
+                if args.archive:
+                    print(f"📦 Archiving notifications older than {args.archive} days...")
+                    archived = sync.archive_old_notifications(args.archive)
+                    print(f"✅ Archived {archived} notifications")
+                    print()
+
+                # Save stats snapshot if requested
+                if args.snapshot:
+                    print("📸 Saving stats snapshot...")
+                    sync.save_stats_snapshot()
+                    print("✅ Snapshot saved")
+                    print()
+
+                # Show current stats, read once after every inbox has committed
+                stats = sync.db.get_current_stats()
+                title = f"{'=' * 70}\n  Current Database Stats\n{'=' * 70}"
+                sys.stdout.write(_status_report(stats, title))
+            finally:
+                close_shared_db()
 
         # Summary
-        print("=" * 70)
-        print("  Sync Summary")
-        print("=" * 70)
-        for inbox_num, result in all_results.items():
-            print(
-                f"Inbox {inbox_num}: {result['emails_fetched']} fetched, "
-                f"{result['emails_stored']} stored"
-            )
-        if failed_inboxes:
-            print(f"Failed: {', '.join(map(str, failed_inboxes))}")
-        print()
+        sys.stdout.write(summary.render())
 
         print("=" * 70)
         print("✅ Sync complete!")
@@ -209,7 +265,7 @@ def main():
         print()
 
         # Return error if any inbox failed
-        return 0 if not failed_inboxes else 1
+        return 0 if not summary.failed else 1
 
     except Exception as e:
         logger.error(f"Sync failed: {e}", exc_info=True)
@@ -5,9 +5,14 @@ Install/uninstall automated ORBCOMM sync with git push deployment
 """
 
 import argparse
+import os
+import re
 import subprocess
 from pathlib import Path
 
+# {{NAME}} placeholders in the plist template
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
 
 class DeploySchedulerSetup:
     """Manages automated sync + deploy scheduler installation"""
@@ -22,9 +27,13 @@ class DeploySchedulerSetup:
 
         # User's LaunchAgents directory
         self.launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-        self.plist_name = "com.orbcomm.tracker.deploy.plist"
+        self.label = "com.orbcomm.tracker.deploy"
+        self.plist_name = f"{self.label}.plist"
         self.plist_path = self.launch_agents_dir / self.plist_name
 
+        # launchd domain for the current user's GUI session
+        self.domain = f"gui/{os.getuid()}"
+
         # Log directory
         self.log_dir = Path.home() / ".orbcomm" / "logs"
 
@@ -32,8 +41,17 @@ class DeploySchedulerSetup:
         self.hour = hour
         self.minute = minute
 
+        # Set once check_requirements passes; re-runs skip the checks
+        self._requirements_ok = False
+
+        # Plist template text, read on first use
+        self._template = None
+
     def check_requirements(self):
         """Check if all requirements are met"""
+        if self._requirements_ok:
+            return []
+
         issues = []
 
         if not self.python_path.exists():
@@ -45,41 +63,47 @@ class DeploySchedulerSetup:
         if not self.template_path.exists():
             issues.append(f"Template not found: {self.template_path}")
 
-        # Check if git is configured
-        try:
-            subprocess.run(
-                ["git", "config", "user.name"],
-                cwd=self.project_dir,
-                check=True,
-                capture_output=True,
-            )
-            subprocess.run(
-                ["git", "config", "user.email"],
-                cwd=self.project_dir,
-                check=True,
-                capture_output=True,
-            )
-        except subprocess.CalledProcessError:
+        # Check if git is configured (one lookup for both keys, all config levels)
+        result = subprocess.run(
+            ["git", "config", "--get-regexp", r"^user\.(name|email)$"],
+            cwd=self.project_dir,
+            capture_output=True,
+            text=True,
+        )
+        configured = {line.split(" ", 1)[0] for line in result.stdout.splitlines()}
+        if not {"user.name", "user.email"} <= configured:
             issues.append("Git not configured (user.name or user.email missing)")
 
+        self._requirements_ok = not issues
         return issues
 
+    def _load_template(self):
+        """Read the plist template once per instance"""
+        if self._template is None:
+            self._template = self.template_path.read_text()
+        return self._template
+
     def generate_plist(self):
         """Generate plist file from template"""
-        # Read template
-        with open(self.template_path, "r") as f:
-            content = f.read()
-
         # Ensure log directory exists
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Replace placeholders
-        content = content.replace("{{PYTHON_PATH}}", str(self.python_path))
-        content = content.replace("{{DEPLOY_SCHEDULER_PATH}}", str(self.scheduler_path))
-        content = content.replace("{{PROJECT_DIR}}", str(self.project_dir))
-        content = content.replace("{{LOG_DIR}}", str(self.log_dir))
-        content = content.replace("{{HOUR}}", str(self.hour))
-        content = content.replace("{{MINUTE}}", str(self.minute))
+        # Replace placeholders in a single pass
+        mapping = {
+            "PYTHON_PATH": str(self.python_path),
+            "DEPLOY_SCHEDULER_PATH": str(self.scheduler_path),
+            "PROJECT_DIR": str(self.project_dir),
+            "LOG_DIR": str(self.log_dir),
+            "HOUR": str(self.hour),
+            "MINUTE": str(self.minute),
+        }
+        try:
+            content = _PLACEHOLDER_RE.sub(
+                lambda m: mapping[m.group(1)], self._load_template()
+            )
+        except KeyError as e:
+            print(f"❌ Unknown placeholder in template: {{{{{e.args[0]}}}}}")
+            return False
 
         # Ensure LaunchAgents directory exists
         self.launch_agents_dir.mkdir(parents=True, exist_ok=True)
@@ -89,6 +113,50 @@ class DeploySchedulerSetup:
             f.write(content)
 
         print(f"✅ Generated plist file: {self.plist_path}")
+        return True
+
+    def _bootstrap(self):
+        """
+        Load the plist with launchctl bootstrap
+
+        Falls back to the legacy load command when bootstrap reports the job
+        as already loaded (5) or is unsupported on this macOS (113).
+
+        Returns:
+            CompletedProcess of the last launchctl command run
+        """
+        result = subprocess.run(
+            ["launchctl", "bootstrap", self.domain, str(self.plist_path)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode in (5, 113):
+            result = subprocess.run(
+                ["launchctl", "load", str(self.plist_path)],
+                capture_output=True,
+                text=True,
+            )
+        return result
+
+    def _bootout(self):
+        """
+        Unload the job with launchctl bootout, falling back to legacy unload
+
+        Returns:
+            CompletedProcess of the last launchctl command run
+        """
+        result = subprocess.run(
+            ["launchctl", "bootout", f"{self.domain}/{self.label}"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 113:
+            result = subprocess.run(
+                ["launchctl", "unload", str(self.plist_path)],
+                capture_output=True,
+                text=True,
+            )
+        return result
 
     def install(self):
         """Install the deploy scheduler"""
@@ -109,16 +177,14 @@ class DeploySchedulerSetup:
         if self.plist_path.exists():
             print("🔄 Unloading existing scheduler...")
             try:
-                subprocess.run(
-                    ["launchctl", "unload", str(self.plist_path)],
-                    capture_output=True,
-                )
+                self._bootout()
             except Exception:
                 pass
 
         # Generate plist file
         print("📝 Generating launchd configuration...")
-        self.generate_plist()
+        if not self.generate_plist():
+            return False
         print()
 
         # Make scheduler executable
@@ -129,17 +195,11 @@ class DeploySchedulerSetup:
 
         # Load into launchd
         print("🚀 Loading scheduler into launchd...")
-        try:
-            subprocess.run(
-                ["launchctl", "load", str(self.plist_path)],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            print("✅ Scheduler loaded successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to load scheduler: {e.stderr}")
+        result = self._bootstrap()
+        if result.returncode != 0:
+            print(f"❌ Failed to load scheduler: {result.stderr}")
             return False
+        print("✅ Scheduler loaded successfully")
 
         print()
         print("=" * 70)
@@ -161,7 +221,7 @@ class DeploySchedulerSetup:
         print("  6. Render auto-deploys with updated database")
         print()
         print("Commands:")
-        print("  Check status:  launchctl list | grep orbcomm")
+        print(f"  Check status:  launchctl print {self.domain}/{self.label}")
         print(f"  View logs:     tail -f {self.log_dir}/deploy_scheduler_stdout.log")
         print(
             "  Uninstall:     ./venv/bin/python3 setup_deploy_scheduler.py --uninstall"
@@ -184,16 +244,11 @@ class DeploySchedulerSetup:
 
         # Unload from launchd
         print("🛑 Unloading scheduler from launchd...")
-        try:
-            subprocess.run(
-                ["launchctl", "unload", str(self.plist_path)],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
+        result = self._bootout()
+        if result.returncode == 0:
             print("✅ Scheduler unloaded")
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️  Warning: {e.stderr}")
+        else:
+            print(f"⚠️  Warning: {result.stderr}")
 
         # Remove plist file
         print("🗑️  Removing plist file...")
@@ -224,26 +279,25 @@ class DeploySchedulerSetup:
             print("To install: ./venv/bin/python3 setup_deploy_scheduler.py --install")
             return
 
-        # Check launchd status
-        try:
-            result = subprocess.run(
-                ["launchctl", "list"], check=True, capture_output=True, text=True
-            )
-
-            if "com.orbcomm.tracker.deploy" in result.stdout:
-                print("✅ Scheduler is loaded in launchd")
+        # Check launchd status (queries this one service only)
+        result = subprocess.run(
+            ["launchctl", "print", f"{self.domain}/{self.label}"],
+            capture_output=True,
+            text=True,
+        )
 
-                # Extract status from launchctl list
-                for line in result.stdout.split("\n"):
-                    if "com.orbcomm.tracker.deploy" in line:
-                        print(f"   Status: {line}")
-            else:
-                print("❌ Scheduler not loaded in launchd")
-                print()
-                print(f"To load: launchctl load {self.plist_path}")
+        if result.returncode == 0:
+            print("✅ Scheduler is loaded in launchd")
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error checking status: {e.stderr}")
+            # Show the state and last exit code from launchctl print
+            for line in result.stdout.splitlines():
+                line = line.strip()
+                if line.startswith(("state =", "last exit code =")):
+                    print(f"   {line}")
+        else:
+            print("❌ Scheduler not loaded in launchd")
+            print()
+            print(f"To load: launchctl bootstrap {self.domain} {self.plist_path}")
 
         print()
 
@@ -254,12 +308,15 @@ class DeploySchedulerSetup:
 
         if stdout_log.exists():
             print(f"  ✅ Standard output: {stdout_log}")
-            # Show last few lines
+            # Show the last line, reading only the end of the log
             try:
-                with open(stdout_log, "r") as f:
-                    lines = f.readlines()
-                    if lines:
-                        print(f"     Last line: {lines[-1].strip()}")
+                size = stdout_log.stat().st_size
+                with open(stdout_log, "rb") as f:
+                    f.seek(max(0, size - 4096))
+                    tail = f.read().decode(errors="replace").rstrip()
+                if tail:
+                    last_line = tail.rsplit("\n", 1)[-1].strip()
+                    print(f"     Last line: {last_line}")
             except Exception:
                 pass
         else:
@@ -5,16 +5,154 @@ Handles OAuth authentication for multiple Gmail inboxes
 """
 
 import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
 
 # Gmail API scope (read-only)
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Tokens this close to expiry are refreshed before use. google-auth already
+# treats tokens within ~4 minutes of expiry as invalid, so the window has to
+# start well before that for the refreshed token to outlast the run.
+REFRESH_MARGIN = timedelta(minutes=10)
+
+
+@lru_cache(maxsize=8)
+def _load_creds(token_path: str, mtime_ns: int) -> Credentials:
+    """Parse token.json once per file version (mtime_ns is the cache key)"""
+    return Credentials.from_authorized_user_file(token_path, SCOPES)
+
+
+def load_credentials(token_file: Path) -> Credentials:
+    """
+    Load saved credentials, reusing the parsed object until the file changes
+
+    Args:
+        token_file: Path to an inbox's token.json
+
+    Returns:
+        Credentials (shared between callers for the same file version)
+    """
+    return _load_creds(str(token_file), token_file.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _gmail_discovery_doc() -> str:
+    """Gmail v1 discovery document bundled with googleapiclient, read once"""
+    return discovery_cache.get_static_doc("gmail", "v1")
+
+
+def build_gmail_service(creds: Credentials):
+    """
+    Build a Gmail v1 service from the bundled discovery document
+
+    Never fetches discovery over HTTP, and reads the document from disk only
+    once per process.
+    """
+    return build_from_document(_gmail_discovery_doc(), credentials=creds)
+
+
+@lru_cache(maxsize=8)
+def _gmail_service(token_path: str, mtime_ns: int):
+    """Service for one version of a token file (mtime_ns is the cache key)"""
+    return build_gmail_service(_load_creds(token_path, mtime_ns))
+
+
+def gmail_service_for_token(token_file: Path):
+    """
+    Gmail service for a saved token, reused until token.json changes
+
+    Args:
+        token_file: Path to an inbox's token.json
+
+    Returns:
+        Gmail v1 service built from that token's credentials
+    """
+    return _gmail_service(str(token_file), token_file.stat().st_mtime_ns)
+
+
+def save_token(creds: Credentials, token_file: Path):
+    """
+    Write token.json atomically, owner-only, and flushed to disk
+
+    A crash mid-write leaves the previous token intact instead of a
+    truncated file that would force the browser flow again.
+
+    Args:
+        creds: Credentials to persist
+        token_file: Destination token.json
+    """
+    tmp_path = token_file.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(creds.to_json())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, token_file)
+
+
+def save_inbox_email(config_dir: Path, email: str):
+    """Record the authenticated address in the inbox's meta.json"""
+    (config_dir / "meta.json").write_text(json.dumps({"email": email}))
+
+
+def load_inbox_email(config_dir: Path) -> Optional[str]:
+    """
+    Authenticated address saved by save_inbox_email
+
+    Args:
+        config_dir: Inbox config directory (~/.orbcomm/inboxN)
+
+    Returns:
+        Email address, or None if meta.json is missing or unreadable
+    """
+    try:
+        return json.loads((config_dir / "meta.json").read_text()).get("email")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def maybe_refresh(creds: Credentials, token_file: Path) -> bool:
+    """
+    Refresh a valid token that expires within REFRESH_MARGIN and save it
+
+    Runs inline: the CLI is about to call the API anyway, and a background
+    thread would be killed when the short-lived process exits. On failure
+    the caller keeps using the still-valid token.
+
+    Args:
+        creds: Loaded credentials, refreshed in place
+        token_file: token.json to rewrite after refreshing
+
+    Returns:
+        True if the token was refreshed and saved
+    """
+    if not creds.valid or creds.expiry is None or not creds.refresh_token:
+        return False
+
+    # google-auth stores expiry as naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if creds.expiry - now >= REFRESH_MARGIN:
+        return False
+
+    try:
+        creds.refresh(Request())
+        save_token(creds, token_file)
+        return True
+    except Exception as e:
+        print(f"⚠️  Token refresh failed, using current token: {e}")
+        return False
+
 
 def authenticate_inbox(inbox_number: int, email: str):
     """
@@ -49,7 +187,8 @@ def authenticate_inbox(inbox_number: int, email: str):
     # Load existing token if available
     if token_file.exists():
         print("\n📋 Found existing token, attempting to load...")
-        creds = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+        creds = load_credentials(token_file)
+        maybe_refresh(creds, token_file)
 
     # If no valid credentials, authenticate
     if not creds or not creds.valid:
@@ -67,18 +206,18 @@ def authenticate_inbox(inbox_number: int, email: str):
             creds = flow.run_local_server(port=0)
 
         # Save credentials
-        with open(token_file, "w") as token:
-            token.write(creds.to_json())
+        save_token(creds, token_file)
         print(f"\n✅ Token saved to: {token_file}")
 
     # Test the connection
     try:
         print("\n🧪 Testing connection...")
-        service = build("gmail", "v1", credentials=creds)
+        service = gmail_service_for_token(token_file)
 
         # Get user profile to verify
         profile = service.users().getProfile(userId="me").execute()
         authenticated_email = profile["emailAddress"]
+        save_inbox_email(config_dir, authenticated_email)
 
         print("✅ Successfully authenticated!")
         print(f"   Email: {authenticated_email}")
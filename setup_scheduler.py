@@ -5,9 +5,14 @@ Install/uninstall daily ORBCOMM sync scheduler for macOS
 """
 
 import argparse
+import os
+import re
 import subprocess
 from pathlib import Path
 
+# {{NAME}} placeholders in the plist template
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
 
 class SchedulerSetup:
     """Manages launchd scheduler installation"""
@@ -20,9 +25,13 @@ class SchedulerSetup:
 
         # User's LaunchAgents directory
         self.launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-        self.plist_name = "com.orbcomm.tracker.daily.plist"
+        self.label = "com.orbcomm.tracker.daily"
+        self.plist_name = f"{self.label}.plist"
         self.plist_path = self.launch_agents_dir / self.plist_name
 
+        # launchd domain for the current user's GUI session
+        self.domain = f"gui/{os.getuid()}"
+
         # Log directory
         self.log_dir = Path.home() / ".orbcomm" / "logs"
 
@@ -50,11 +59,18 @@ class SchedulerSetup:
         # Ensure log directory exists
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Replace placeholders
-        content = content.replace("{{PYTHON_PATH}}", str(self.python_path))
-        content = content.replace("{{SCHEDULER_PATH}}", str(self.scheduler_path))
-        content = content.replace("{{PROJECT_DIR}}", str(self.project_dir))
-        content = content.replace("{{LOG_DIR}}", str(self.log_dir))
+        # Replace placeholders in a single pass
+        mapping = {
+            "PYTHON_PATH": str(self.python_path),
+            "SCHEDULER_PATH": str(self.scheduler_path),
+            "PROJECT_DIR": str(self.project_dir),
+            "LOG_DIR": str(self.log_dir),
+        }
+        try:
+            content = _PLACEHOLDER_RE.sub(lambda m: mapping[m.group(1)], content)
+        except KeyError as e:
+            print(f"❌ Unknown placeholder in template: {{{{{e.args[0]}}}}}")
+            return False
 
         # Ensure LaunchAgents directory exists
         self.launch_agents_dir.mkdir(parents=True, exist_ok=True)
@@ -64,6 +80,11 @@ class SchedulerSetup:
             f.write(content)
 
         print(f"✅ Generated plist file: {self.plist_path}")
+        return True
+
+    def _launchctl(self, *args):
+        """Run a launchctl subcommand; output is kept as bytes for error reports"""
+        return subprocess.run(["launchctl", *args], capture_output=True)
 
     def install(self):
         """Install the scheduler"""
@@ -82,7 +103,8 @@ class SchedulerSetup:
 
         # Generate plist file
         print("📝 Generating launchd configuration...")
-        self.generate_plist()
+        if not self.generate_plist():
+            return False
         print()
 
         # Make scheduler executable
@@ -93,17 +115,17 @@ class SchedulerSetup:
 
         # Load into launchd
         print("🚀 Loading scheduler into launchd...")
-        try:
-            subprocess.run(
-                ["launchctl", "load", str(self.plist_path)],
-                check=True,
-                capture_output=True,
-                text=True,
+        result = self._launchctl("bootstrap", self.domain, str(self.plist_path))
+        if result.returncode == 5:
+            # Already loaded: reload so the regenerated plist takes effect
+            self._launchctl("bootout", f"{self.domain}/{self.label}")
+            result = self._launchctl("bootstrap", self.domain, str(self.plist_path))
+        if result.returncode != 0:
+            print(
+                f"❌ Failed to load scheduler: {result.stderr.decode(errors='replace')}"
             )
-            print("✅ Scheduler loaded successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to load scheduler: {e.stderr}")
             return False
+        print("✅ Scheduler loaded successfully")
 
         print()
         print("=" * 70)
@@ -136,16 +158,11 @@ class SchedulerSetup:
 
         # Unload from launchd
         print("🛑 Unloading scheduler from launchd...")
-        try:
-            subprocess.run(
-                ["launchctl", "unload", str(self.plist_path)],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
+        result = self._launchctl("bootout", f"{self.domain}/{self.label}")
+        if result.returncode == 0:
             print("✅ Scheduler unloaded")
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️  Warning: {e.stderr}")
+        else:
+            print(f"⚠️  Warning: {result.stderr.decode(errors='replace')}")
 
         # Remove plist file
         print("🗑️  Removing plist file...")
@@ -176,26 +193,17 @@ class SchedulerSetup:
             print("To install: ./venv/bin/python3 setup_scheduler.py --install")
             return
 
-        # Check launchd status
-        try:
-            result = subprocess.run(
-                ["launchctl", "list"], check=True, capture_output=True, text=True
-            )
-
-            if "com.orbcomm.tracker.daily" in result.stdout:
-                print("✅ Scheduler is loaded in launchd")
-
-                # Extract status from launchctl list
-                for line in result.stdout.split("\n"):
-                    if "com.orbcomm.tracker.daily" in line:
-                        print(f"   Status: {line}")
-            else:
-                print("❌ Scheduler not loaded in launchd")
-                print()
-                print(f"To load: launchctl load {self.plist_path}")
-
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error checking status: {e.stderr}")
+        # Ask launchd about just this job; non-zero exit means it isn't loaded
+        result = self._launchctl("list", self.label)
+        if result.returncode == 0:
+            print("✅ Scheduler is loaded in launchd")
+            for line in result.stdout.decode(errors="replace").splitlines():
+                if '"PID"' in line or '"LastExitStatus"' in line:
+                    print(f"   {line.strip().rstrip(';')}")
+        else:
+            print("❌ Scheduler not loaded in launchd")
+            print()
+            print(f"To load: launchctl bootstrap {self.domain} {self.plist_path}")
 
         print()
 
@@ -206,12 +214,15 @@ class SchedulerSetup:
 
         if stdout_log.exists():
             print(f"  ✅ Standard output: {stdout_log}")
-            # Show last few lines
+            # Show the last non-empty line, reading only the end of the log
             try:
-                with open(stdout_log, "r") as f:
-                    lines = f.readlines()
-                    if lines:
-                        print(f"     Last line: {lines[-1].strip()}")
+                with open(stdout_log, "rb") as f:
+                    f.seek(0, os.SEEK_END)
+                    f.seek(max(0, f.tell() - 4096))
+                    tail = f.read().decode("utf-8", "replace").splitlines()
+                last_line = next((line for line in reversed(tail) if line.strip()), "")
+                if last_line:
+                    print(f"     Last line: {last_line.strip()}")
             except Exception:
                 pass
         else:
@@ -3,12 +3,19 @@
 Test Gmail API connections for all configured inboxes
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from setup_gmail_auth import (
+    gmail_service_for_token,
+    load_credentials,
+    load_inbox_email,
+    maybe_refresh,
+)
 
-SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+# From this many inboxes on, probe in separate processes so response
+# parsing isn't serialized on the GIL; below it, threads start faster
+PROCESS_POOL_MIN_INBOXES = 3
 
 
 def test_inbox(inbox_number: int):
@@ -21,26 +28,38 @@ def test_inbox(inbox_number: int):
 
     try:
         # Load credentials
-        creds = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+        creds = load_credentials(token_file)
+        maybe_refresh(creds, token_file)
 
         if not creds.valid:
             return None, "Token is invalid or expired"
 
         # Build service
-        service = build("gmail", "v1", credentials=creds)
+        service = gmail_service_for_token(token_file)
 
-        # Get profile
-        profile = service.users().getProfile(userId="me").execute()
-        email = profile["emailAddress"]
+        # Count ORBCOMM emails, fetching the profile in the same batch only
+        # when the address wasn't saved at authentication time
+        email = load_inbox_email(config_dir)
+        responses = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                raise exception
+            responses[request_id] = response
 
-        # Count ORBCOMM emails
         query = 'subject:"ORBCOMM Service Notification:"'
-        results = (
-            service.users()
-            .messages()
-            .list(userId="me", q=query, maxResults=1)
-            .execute()
+        batch = service.new_batch_http_request(callback=callback)
+        if email is None:
+            batch.add(service.users().getProfile(userId="me"), request_id="profile")
+        batch.add(
+            service.users().messages().list(userId="me", q=query, maxResults=1),
+            request_id="list",
         )
+        batch.execute()
+
+        if email is None:
+            email = responses["profile"]["emailAddress"]
+        results = responses["list"]
 
         total_count = results.get("resultSizeEstimate", 0)
 
@@ -79,21 +98,35 @@ def main():
     print("=" * 70)
     print()
 
-    inboxes_found = 0
-    inboxes_connected = 0
-
-    # Test up to 5 possible inboxes
+    # Configured inboxes are numbered consecutively from 1 (up to 5)
+    configured = []
+    missing = None
     for inbox_num in range(1, 6):
-        config_dir = Path.home() / ".orbcomm" / f"inbox{inbox_num}"
-
-        if not config_dir.exists():
-            if inbox_num <= 2:  # Only mention missing for first 2
-                print(f"⚪ Inbox {inbox_num}: Not configured")
+        if not (Path.home() / ".orbcomm" / f"inbox{inbox_num}").exists():
+            missing = inbox_num
             break
+        configured.append(inbox_num)
 
-        inboxes_found += 1
+    # Probe all inboxes at once; each test is a few blocking HTTPS calls
+    results = {}
+    if configured:
+        if len(configured) >= PROCESS_POOL_MIN_INBOXES:
+            pool_class = ProcessPoolExecutor
+        else:
+            pool_class = ThreadPoolExecutor
+        with pool_class(max_workers=len(configured)) as executor:
+            futures = {
+                executor.submit(test_inbox, inbox_num): inbox_num
+                for inbox_num in configured
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    inboxes_found = len(configured)
+    inboxes_connected = 0
 
-        result, error = test_inbox(inbox_num)
+    for inbox_num in configured:
+        result, error = results[inbox_num]
 
         if error:
             print(f"❌ Inbox {inbox_num}: Failed")
@@ -106,6 +139,9 @@ def main():
                 print(f"   Latest: {result['latest_date'][:25]}...")
         print()
 
+    if missing is not None and missing <= 2:  # Only mention missing for first 2
+        print(f"⚪ Inbox {missing}: Not configured")
+
     print("=" * 70)
 
     if inboxes_connected == 0:
@@ -5,27 +5,12 @@ Simplified unit tests for incident time parsing from ORBCOMM emails.
 Tests focus on the incident duration extraction feature added in v1.1.0.
 """
 
-import os
 import sys
 import unittest
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from orbcomm_processor import SimpleORBCOMMParser
 
-from orbcomm_processor import SimpleORBCOMMParser  # noqa: E402
-
-
-class TestIncidentDurationFeature(unittest.TestCase):
-    """Test the incident duration tracking feature."""
-
-    def setUp(self):
-        """Set up test parser instance."""
-        self.parser = SimpleORBCOMMParser()
-
-    def test_real_world_s003141_with_subject(self):
-        """Test S-003141 incident with proper subject and body."""
-        subject = "ORBCOMM Service Notification [S-003141] IDP - RESOLVED"
-        body = """
+_BODY_S003141 = b"""
         <html><body>
         <p><b>Platform:</b>&nbsp;IDP</p>
         <p><b>Status:</b>&nbsp;Resolved</p>
@@ -35,22 +20,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        # Verify basic parsing
-        self.assertEqual(result["reference_number"], "S-003141")
-        self.assertEqual(result["status"], "Resolved")
-        self.assertEqual(result["platform"], "IDP")
-
-        # Verify incident duration extraction
-        self.assertEqual(result["incident_start_time"], "2025-10-22 15:05:00")
-        self.assertEqual(result["incident_end_time"], "2025-10-23 00:37:00")
-        self.assertEqual(result["incident_duration_minutes"], 572)
-
-    def test_real_world_m003128_with_subject(self):
-        """Test M-003128 incident (1 hour duration)."""
-        subject = "ORBCOMM Service Notification [M-003128] OGx - RESOLVED"
-        body = """
+_BODY_M003128 = b"""
         <html><body>
         <p><b>Platform:</b>&nbsp;OGx</p>
         <p><b>Status:</b>&nbsp;Resolved</p>
@@ -59,15 +29,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        self.assertEqual(result["reference_number"], "M-003128")
-        self.assertEqual(result["incident_duration_minutes"], 60)
-
-    def test_resolved_without_incident_times(self):
-        """Test backward compatibility - resolved email without incident times."""
-        subject = "ORBCOMM Service Notification [S-003000] IDP - RESOLVED"
-        body = """
+_BODY_RESOLVED_NO_TIMES = b"""
         <html><body>
         <p><b>Platform:</b>&nbsp;IDP</p>
         <p><b>Status:</b>&nbsp;Resolved</p>
@@ -75,17 +37,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        self.assertEqual(result["status"], "Resolved")
-        self.assertIsNone(result["incident_start_time"])
-        self.assertIsNone(result["incident_end_time"])
-        self.assertIsNone(result["incident_duration_minutes"])
-
-    def test_open_notification_no_times(self):
-        """Test open notification doesn't extract incident times."""
-        subject = "ORBCOMM Service Notification [S-003100] IDP - OPEN"
-        body = """
+_BODY_OPEN = b"""
         <html><body>
         <p><b>Platform:</b>&nbsp;IDP</p>
         <p><b>Status:</b>&nbsp;Open</p>
@@ -93,17 +45,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        self.assertEqual(result["status"], "Open")
-        self.assertIsNone(result["incident_start_time"])
-        self.assertIsNone(result["incident_end_time"])
-        self.assertIsNone(result["incident_duration_minutes"])
-
-    def test_malformed_start_time_graceful(self):
-        """Test graceful handling of malformed start time."""
-        subject = "ORBCOMM Service Notification [S-003200] IDP - RESOLVED"
-        body = """
+_BODY_MALFORMED_START = b"""
         <html><body>
         <p><b>Status:</b>&nbsp;Resolved</p>
         <p><b>Start Time:</b>&nbsp;INVALID FORMAT</p>
@@ -111,17 +53,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        self.assertEqual(result["status"], "Resolved")
-        self.assertIsNone(result["incident_start_time"])
-        self.assertEqual(result["incident_end_time"], "2025-10-20 14:00:00")
-        self.assertIsNone(result["incident_duration_minutes"])
-
-    def test_multiday_incident_duration(self):
-        """Test incident spanning multiple days."""
-        subject = "ORBCOMM Service Notification [S-003300] IDP - RESOLVED"
-        body = """
+_BODY_MULTIDAY = b"""
         <html><body>
         <p><b>Status:</b>&nbsp;Resolved</p>
         <p><b>Start Time:</b>&nbsp;2025-10-20 23:00 GMT</p>
@@ -129,14 +61,7 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
-
-        self.assertEqual(result["incident_duration_minutes"], 1560)  # 26 hours
-
-    def test_whitespace_variations_in_html(self):
-        """Test parsing with extra whitespace."""
-        subject = "ORBCOMM Service Notification [S-003400] IDP - RESOLVED"
-        body = """
+_BODY_WHITESPACE = b"""
         <html><body>
         <p><b>Status:</b>&nbsp;Resolved</p>
         <p><b>Start Time:</b>    &nbsp;   2025-10-20 10:00 GMT   </p>
@@ -144,10 +69,103 @@ class TestIncidentDurationFeature(unittest.TestCase):
         </body></html>
         """
 
-        result = self.parser.parse_text(body, subject=subject)
 
-        self.assertEqual(result["incident_start_time"], "2025-10-20 10:00:00")
-        self.assertEqual(result["incident_duration_minutes"], 120)
+_SUBJECT = "ORBCOMM Service Notification [{}] {} - {}"
+
+# (name, subject, body, expected parse_text fields)
+CASES = [
+    (
+        "real_world_s003141",
+        _SUBJECT.format("S-003141", "IDP", "RESOLVED"),
+        _BODY_S003141,
+        {
+            "reference_number": "S-003141",
+            "status": "Resolved",
+            "platform": "IDP",
+            "incident_start_time": "2025-10-22 15:05:00",
+            "incident_end_time": "2025-10-23 00:37:00",
+            "incident_duration_minutes": 572,
+        },
+    ),
+    (
+        # Decoded text parses the same as the raw bytes
+        "real_world_s003141_text",
+        _SUBJECT.format("S-003141", "IDP", "RESOLVED"),
+        _BODY_S003141.decode(),
+        {"incident_duration_minutes": 572},
+    ),
+    (
+        "real_world_m003128_one_hour",
+        _SUBJECT.format("M-003128", "OGx", "RESOLVED"),
+        _BODY_M003128,
+        {"reference_number": "M-003128", "incident_duration_minutes": 60},
+    ),
+    (
+        "resolved_without_incident_times",
+        _SUBJECT.format("S-003000", "IDP", "RESOLVED"),
+        _BODY_RESOLVED_NO_TIMES,
+        {
+            "status": "Resolved",
+            "incident_start_time": None,
+            "incident_end_time": None,
+            "incident_duration_minutes": None,
+        },
+    ),
+    (
+        "open_notification_no_times",
+        _SUBJECT.format("S-003100", "IDP", "OPEN"),
+        _BODY_OPEN,
+        {
+            "status": "Open",
+            "incident_start_time": None,
+            "incident_end_time": None,
+            "incident_duration_minutes": None,
+        },
+    ),
+    (
+        "malformed_start_time_graceful",
+        _SUBJECT.format("S-003200", "IDP", "RESOLVED"),
+        _BODY_MALFORMED_START,
+        {
+            "status": "Resolved",
+            "incident_start_time": None,
+            "incident_end_time": "2025-10-20 14:00:00",
+            "incident_duration_minutes": None,
+        },
+    ),
+    (
+        "multiday_incident_26_hours",
+        _SUBJECT.format("S-003300", "IDP", "RESOLVED"),
+        _BODY_MULTIDAY,
+        {"incident_duration_minutes": 1560},
+    ),
+    (
+        "whitespace_variations_in_html",
+        _SUBJECT.format("S-003400", "IDP", "RESOLVED"),
+        _BODY_WHITESPACE,
+        {
+            "incident_start_time": "2025-10-20 10:00:00",
+            "incident_duration_minutes": 120,
+        },
+    ),
+]
+
+
+class TestIncidentDurationFeature(unittest.TestCase):
+    """Test the incident duration tracking feature."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up one shared parser; parse_text keeps no per-email state."""
+        cls.parser = SimpleORBCOMMParser()
+
+    def test_cases(self):
+        """Test each fixture email against its expected fields."""
+        for name, subject, body, expected in CASES:
+            with self.subTest(name=name):
+                result = self.parser.parse_text(body, subject=subject)
+                for field, value in expected.items():
+                    self.assertEqual(result[field], value, field)
 
 
 def run_tests():
@@ -4,64 +4,107 @@ Tests the full application stack
 """
 
 import os
-import sys
-import tempfile
-from pathlib import Path
+import random
+import uuid
+from datetime import datetime, timedelta
 
 import pytest
 
-# Add project to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from orbcomm_tracker.database import NOTIFICATION_FIELDS, Database
+
+# Notification with all required fields; tests override what they check
+BASE_NOTIFICATION = {
+    "reference_number": "S123456",
+    "gmail_message_id": "test_msg_id_123456",
+    "event_type": "Service Interruption",
+    "summary": "Test notification summary",
+    "raw_email_subject": "Test Subject",
+    "date_received": "2025-01-01 10:00:00",
+    "status": "Open",
+    "platform": "IDP",
+    "raw_email_body": "Test body",
+    "inbox_source": "test_inbox",
+}
+
+
+def _notification(**overrides):
+    """BASE_NOTIFICATION with the given fields replaced"""
+    return {**BASE_NOTIFICATION, **overrides}
+
+
+def _make_rows(n):
+    """n insert tuples for Database.insert_notifications_rows, built per column"""
+    columns = {
+        "reference_number": [f"S{i:06d}" for i in range(n)],
+        "gmail_message_id": [f"test_msg_id_{i}" for i in range(n)],
+        "summary": [f"Test notification {i}" for i in range(n)],
+        "status": ["Open" if i % 2 == 0 else "Resolved" for i in range(n)],
+    }
+    constant = {"priority": "Medium", **BASE_NOTIFICATION}
+    return list(
+        zip(*(columns.get(f) or [constant.get(f)] * n for f in NOTIFICATION_FIELDS))
+    )
+
+
+def _memory_db():
+    """Private in-memory Database, freed when its last connection closes"""
+    db = Database(f"file:testdb_{uuid.uuid4().hex}?mode=memory&cache=shared", uri=True)
+    # Nothing to make durable, so skip journaling cost; keep sort/temp-index
+    # spill and page cache in RAM as well
+    db.conn.executescript(
+        "PRAGMA journal_mode = MEMORY; PRAGMA synchronous = OFF;"
+        " PRAGMA temp_store = MEMORY; PRAGMA cache_size = -20000;"
+    )
+    return db
+
+
+def _pairing_dataset(seed, references=40):
+    """Notifications covering the pairing cases, in insertion order"""
+    rng = random.Random(seed)
+    statuses = ["Open", "Continuing", "Resolved"]
+    rows = []
+    received = datetime(2025, 1, 1)
+    for ref in range(references):
+        for n in range(rng.randint(1, 4)):
+            received += timedelta(minutes=rng.randint(1, 240))
+            rows.append(
+                _notification(
+                    reference_number=f"S{ref:06d}",
+                    gmail_message_id=f"pairing_msg_{ref}_{n}",
+                    status=rng.choice(statuses),
+                    date_received=received.strftime("%Y-%m-%d %H:%M:%S"),
+                    incident_duration_minutes=rng.choice([None, rng.randint(1, 600)]),
+                    inbox_source=rng.choice(["inbox1", "inbox2"]),
+                )
+            )
+    return rows
+
 
-from orbcomm_tracker.database import Database  # noqa: E402
+@pytest.fixture
+def temp_db():
+    """Create a private in-memory database for testing"""
+    db = _memory_db()
+    yield db
+    db.close()  # Last connection closed; SQLite frees the database
 
 
 class TestDatabaseIntegration:
     """Test database operations"""
 
-    @pytest.fixture
-    def temp_db(self):
-        """Create temporary database for testing"""
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-            db_path = f.name
-
-        db = Database(db_path)
-        db.create_tables()
-        yield db
-        db.close()
-
-        # Cleanup
-        if os.path.exists(db_path):
-            os.unlink(db_path)
-
     def test_notification_lifecycle(self, temp_db):
         """Test complete notification lifecycle"""
         # Store notification with all required fields
-        notification_data = {
-            "reference_number": "S123456",
-            "gmail_message_id": "test_msg_id_123456",
-            "event_type": "Service Interruption",
-            "summary": "Test notification summary",
-            "raw_email_subject": "Test Subject",
-            "date_received": "2025-01-01 10:00:00",
-            "status": "Open",
-            "platform": "IDP",
-            "raw_email_body": "Test body",
-            "inbox_source": "test_inbox",
-        }
-
-        result = temp_db.insert_notification(notification_data)
+        result = temp_db.insert_notification(_notification())
         assert result is not None  # Returns integer ID on success
 
         # Get notification
-        notifications = temp_db.get_all_notifications()
-        assert len(notifications) == 1
-        assert notifications[0]["reference_number"] == "S123456"
+        assert temp_db.count_notifications() == 1
+        assert temp_db.get_notification_by_reference("S123456") is not None
 
         # Insert resolved notification with unique gmail_message_id
-        resolved_data = notification_data.copy()
-        resolved_data["gmail_message_id"] = "test_msg_id_123456_resolved"
-        resolved_data["status"] = "Resolved"
+        resolved_data = _notification(
+            gmail_message_id="test_msg_id_123456_resolved", status="Resolved"
+        )
         result = temp_db.insert_notification(resolved_data)
         assert result is not None  # Returns integer ID on success
 
@@ -69,33 +112,146 @@ class TestDatabaseIntegration:
         temp_db.link_notification_pair("S123456")
 
         # Check pairing
+        assert temp_db.count_pairs() == 1
+        pair_id = temp_db.get_notification_pairs()[0]["id"]
+
+        # Bulk linking leaves the existing pair alone
+        assert temp_db.link_all_notification_pairs() == 0
+        assert temp_db.count_pairs() == 1
+        assert temp_db.get_notification_pairs()[0]["id"] == pair_id
+
+    def test_link_all_notification_pairs(self, temp_db):
+        """Test bulk linking pairs unlinked rows and honours the inbox filter"""
+        for ref, inbox, msg, status, received in [
+            ("S100001", "inbox1", "a_open", "Open", "2025-01-01 10:00:00"),
+            ("S100001", "inbox1", "a_cont", "Continuing", "2025-01-01 10:30:00"),
+            ("S100001", "inbox1", "a_res", "Resolved", "2025-01-01 11:30:00"),
+            ("S200002", "inbox2", "b_open", "Open", "2025-01-02 08:00:00"),
+            ("S200002", "inbox2", "b_res", "Resolved", "2025-01-02 08:45:00"),
+        ]:
+            temp_db.insert_notification(
+                _notification(
+                    reference_number=ref,
+                    gmail_message_id=msg,
+                    status=status,
+                    date_received=received,
+                    inbox_source=inbox,
+                    incident_duration_minutes=75 if msg == "a_res" else None,
+                )
+            )
+
+        assert temp_db.link_all_notification_pairs(inbox_source="inbox1") == 1
+
         pairs = temp_db.get_notification_pairs()
-        assert len(pairs) == 1
+        assert [p["reference_number"] for p in pairs] == ["S100001"]
+        assert pairs[0]["time_to_resolve_minutes"] == 90
+        assert pairs[0]["incident_duration_minutes"] == 75
+
+        resolved = temp_db.conn.execute(
+            "SELECT resolution_date, time_to_resolve_minutes FROM notifications"
+            " WHERE gmail_message_id = 'a_res'"
+        ).fetchone()
+        assert resolved["resolution_date"] == "2025-01-01T11:30:00"
+        assert resolved["time_to_resolve_minutes"] == 90
+
+        statuses = dict(
+            temp_db.conn.execute("SELECT gmail_message_id, status FROM notifications")
+        )
+        assert statuses["a_open"] == statuses["a_cont"] == "Resolved"
+        # The other inbox's reference is left untouched
+        assert statuses["b_open"] == "Open"
+
+        assert temp_db.link_all_notification_pairs() == 1
+        assert temp_db.count_pairs() == 2
+
+    def test_link_all_matches_per_reference(self, temp_db):
+        """Test bulk linking leaves the same tables as linking each reference"""
+        rows = _pairing_dataset(seed=7)
+        expected = _memory_db()
+        try:
+            for db in (temp_db, expected):
+                assert db.insert_notifications_many(rows) == (len(rows), 0)
+
+            for ref in sorted({row["reference_number"] for row in rows}):
+                expected.link_notification_pair(ref)
+            assert temp_db.link_all_notification_pairs() > 0
+
+            for query in (
+                "SELECT reference_number, open_notification_id,"
+                " resolved_notification_id, time_to_resolve_minutes,"
+                " incident_duration_minutes FROM notification_pairs"
+                " ORDER BY reference_number",
+                "SELECT id, status, resolution_date, time_to_resolve_minutes"
+                " FROM notifications ORDER BY id",
+            ):
+                actual_rows = [tuple(r) for r in temp_db.conn.execute(query)]
+                expected_rows = [tuple(r) for r in expected.conn.execute(query)]
+                assert actual_rows == expected_rows
+        finally:
+            expected.close()
+
+    def test_notification_records(self, temp_db):
+        """Test typed notification records"""
+        temp_db.insert_notification(
+            _notification(
+                reference_number="S654321",
+                gmail_message_id="test_record_msg",
+                event_type="Maintenance",
+                summary="Record test",
+            )
+        )
+
+        records = temp_db.get_notification_records(status="Open")
+        assert len(records) == 1
+        assert records[0].reference_number == "S654321"
+        assert records[0].priority == "Medium"
+        assert temp_db.get_notification_records(status="Resolved") == []
+
+    def test_bulk_insert(self, temp_db):
+        """Test batch insert skips already-stored messages"""
+        rows = [
+            _notification(
+                reference_number=f"S{i:06d}",
+                gmail_message_id=f"test_bulk_msg_{i}",
+                event_type="Maintenance",
+                summary=f"Bulk notification {i}",
+            )
+            for i in range(3)
+        ]
+
+        assert temp_db.insert_notifications_many(rows[:2]) == (2, 0)
+        assert temp_db.insert_notifications_many(rows) == (1, 0)
+        assert temp_db.count_notifications() == 3
 
     def test_stats_calculation(self, temp_db):
         """Test statistics calculation"""
-        # Add test data with all required fields
-        for i in range(5):
-            temp_db.insert_notification(
-                {
-                    "reference_number": f"S{i:06d}",
-                    "gmail_message_id": f"test_msg_id_{i}",
-                    "event_type": "Service Interruption",
-                    "summary": f"Test notification {i}",
-                    "raw_email_subject": f"Test {i}",
-                    "date_received": "2025-01-01 10:00:00",
-                    "status": "Open" if i % 2 == 0 else "Resolved",
-                    "platform": "IDP",
-                    "raw_email_body": "Test",
-                    "inbox_source": "test",
-                }
-            )
+        # Add test data with all required fields in one transaction
+        assert temp_db.insert_notifications_rows(_make_rows(5)) == (5, 0)
 
         stats = temp_db.get_current_stats()
         assert stats["total_notifications"] == 5
         assert stats["open_count"] >= 0
         assert stats["resolved_count"] >= 0
 
+    def test_stats_snapshot(self, temp_db):
+        """Test snapshot breakdowns round-trip through history"""
+        temp_db.insert_notification(
+            _notification(
+                reference_number="S000001",
+                gmail_message_id="test_snapshot_msg",
+                event_type="Maintenance",
+                summary="Snapshot test",
+                platform="OGx",
+            )
+        )
+
+        assert temp_db.save_stats_snapshot() is True
+
+        history = temp_db.get_historical_stats(days=1)
+        assert len(history) == 1
+        assert history[0]["platform_breakdown"] == {"OGx": 1}
+        assert history[0]["event_type_breakdown"] == {"Maintenance": 1}
+
     def test_sync_history(self, temp_db):
         """Test sync history tracking"""
         # Record sync - log_sync_start returns the sync_id
@@ -108,34 +264,183 @@ class TestDatabaseIntegration:
             emails_parsed=10,
             errors_count=0,
             status="success",
+            config={"test_inbox_last_internal_date": "1730000000000"},
         )
 
+        # The high-water mark is written with the completion record
+        assert temp_db.get_config("test_inbox_last_internal_date") == "1730000000000"
+
         # Get history
         history = temp_db.get_sync_history(limit=5)
         assert len(history) > 0
         assert history[0]["inbox_source"] == "test_inbox"
 
+    def test_backup_includes_wal_pages(self, tmp_path):
+        """Test backup captures commits not yet checkpointed out of the WAL"""
+        import sqlite3
+
+        db = Database(str(tmp_path / "tracker.db"))
+        db.insert_notification(_notification())
+        assert (tmp_path / "tracker.db-wal").stat().st_size > 0
+
+        backup_path = db.backup(str(tmp_path / "tracker.db.backup"))
+        db.close()
+
+        backup = sqlite3.connect(backup_path)
+        try:
+            count = backup.execute("SELECT COUNT(*) FROM notifications").fetchone()
+            assert count[0] == 1
+        finally:
+            backup.close()
+
     def test_archiving(self, temp_db):
         """Test notification archiving"""
         # Add old notification with all required fields
         temp_db.insert_notification(
-            {
-                "reference_number": "OLD001",
-                "gmail_message_id": "test_old_msg_001",
-                "event_type": "Service Interruption",
-                "summary": "Old notification",
-                "raw_email_subject": "Old notification",
-                "date_received": "2024-01-01 10:00:00",
-                "status": "Resolved",
-                "platform": "IDP",
-                "raw_email_body": "Old",
-                "inbox_source": "test",
-            }
+            _notification(
+                reference_number="OLD001",
+                gmail_message_id="test_old_msg_001",
+                summary="Old notification",
+                date_received="2024-01-01 10:00:00",
+                status="Resolved",
+            )
+        )
+
+        # Recent notification that must survive the cutoff
+        temp_db.insert_notification(
+            _notification(
+                reference_number="NEW001",
+                gmail_message_id="test_new_msg_001",
+                date_received=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            )
         )
 
+        # date_received_ts is derived from date_received on insert
+        ts = temp_db.conn.execute(
+            "SELECT date_received_ts FROM notifications WHERE reference_number = 'OLD001'"
+        ).fetchone()[0]
+        assert ts == 1704103200  # 2024-01-01 10:00:00 as naive UTC epoch
+
         # Archive
         archived = temp_db.archive_old_notifications(days=180)
-        assert archived >= 0
+        assert archived == 1
+        assert [
+            n["reference_number"] for n in temp_db.get_archived_notifications()
+        ] == ["OLD001"]
+        assert temp_db.count_notifications() == 1
+        assert temp_db.get_notification_by_reference("NEW001")["is_archived"] == 0
+
+    def test_date_received_ts_migration(self, tmp_path):
+        """Test opening a pre-date_received_ts database backfills the column"""
+        import sqlite3
+
+        db_path = tmp_path / "legacy.db"
+        legacy = sqlite3.connect(db_path)
+        legacy.executescript(
+            """
+            CREATE TABLE notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reference_number TEXT NOT NULL,
+                gmail_message_id TEXT UNIQUE NOT NULL,
+                thread_id TEXT,
+                inbox_source TEXT,
+                date_received DATETIME NOT NULL,
+                time_received TIME,
+                date_parsed DATETIME DEFAULT CURRENT_TIMESTAMP,
+                last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+                platform TEXT CHECK(platform IN ('IDP', 'OGx', 'OGWS', 'Unknown')),
+                event_type TEXT NOT NULL,
+                status TEXT CHECK(status IN ('Open', 'Resolved', 'Continuing')) DEFAULT 'Open',
+                priority TEXT CHECK(priority IN ('Low', 'Medium', 'High', 'Critical')) DEFAULT 'Medium',
+                scheduled_date TEXT,
+                scheduled_time TEXT,
+                duration TEXT,
+                affected_services TEXT,
+                summary TEXT NOT NULL,
+                raw_email_body TEXT,
+                raw_email_subject TEXT,
+                resolution_date DATETIME,
+                resolution_time TIME,
+                time_to_resolve_minutes INTEGER,
+                incident_start_time DATETIME,
+                incident_end_time DATETIME,
+                incident_duration_minutes INTEGER,
+                is_archived BOOLEAN DEFAULT 0,
+                notes TEXT
+            );
+            INSERT INTO notifications
+                (reference_number, gmail_message_id, date_received, event_type, summary)
+            VALUES
+                ('S000001', 'legacy_msg_1', '2025-01-01 10:00:00', 'Maintenance', 'a'),
+                ('S000002', 'legacy_msg_2', '2025-01-02T08:30:00', 'Maintenance', 'b');
+            """
+        )
+        legacy.close()
+
+        db = Database(str(db_path))
+        try:
+            backfilled = dict(
+                db.conn.execute(
+                    "SELECT reference_number, date_received_ts FROM notifications"
+                )
+            )
+            assert backfilled == {"S000001": 1735725600, "S000002": 1735806600}
+            # Ordering now runs on the backfilled column
+            assert [n["reference_number"] for n in db.get_all_notifications()] == [
+                "S000002",
+                "S000001",
+            ]
+        finally:
+            db.close()
+
+
+class _OfflineGmail:
+    """Stand-in for GmailAPI that serves a fixed list of fetched emails"""
+
+    def __init__(self, emails):
+        self.emails = emails
+
+    def list_message_ids(self, since_date=None, after_timestamp=None):
+        return [email["message_id"] for email in self.emails]
+
+    def iter_email_batches(self, message_ids):
+        yield [email for email in self.emails if email["message_id"] in message_ids]
+
+
+def _email(message_id, reference, platform, internal_date):
+    """Fetched-email dict in the shape GmailAPI returns"""
+    return {
+        "message_id": message_id,
+        "thread_id": f"thread_{message_id}",
+        "subject": f"ORBCOMM Service Notification: {platform} (Reference#: {reference})-Open",
+        "body": f"Platform: {platform}\nEvent: Maintenance\nSummary: Sync test",
+        "date_received": "Tue, 29 Oct 2024 10:00:00 -0000",
+        "internal_date": internal_date,
+    }
+
+
+class TestSyncIntegration:
+    """Test sync bookkeeping against an offline Gmail client"""
+
+    def test_rejected_row_blocks_high_water(self, temp_db):
+        """Test a constraint-violating email counts as an error and is retried"""
+        from orbcomm_tracker.sync import SyncOrchestrator
+
+        sync = SyncOrchestrator(1, db=temp_db)
+        sync._gmail = _OfflineGmail(
+            [
+                _email("msg_ok", "S-000001", "IDP", 1730000000000),
+                _email("msg_bad", "S-000002", "BOGUS", 1730000001000),
+            ]
+        )
+
+        result = sync.sync(force=True)
+
+        assert result["emails_stored"] == 1
+        assert result["errors"] == 1
+        assert result["duplicates"] == 0
+        assert result["status"] == "partial"
+        assert temp_db.get_config("inbox1_last_internal_date") is None
 
 
 class TestConfigurationManagement:
@@ -153,20 +458,21 @@ class TestConfigurationManagement:
         prod_config = get_config("production")
         assert prod_config.DEBUG is False
 
-    def test_env_variables(self):
+        # Lookups return the class itself, built once at import
+        assert get_config("development") is dev_config
+
+    def test_env_variables(self, monkeypatch):
         """Test environment variable override"""
         from config import Config
 
         # Test default values
         assert Config.PORT == int(os.environ.get("PORT", "5000"))
 
-        # Test environment override
-        os.environ["PORT"] = "8080"
+        # Test environment override; monkeypatch restores any prior value,
+        # so the test is safe to run alongside others under xdist
+        monkeypatch.setenv("PORT", "8080")
         assert int(os.environ.get("PORT", "5000")) == 8080
 
-        # Cleanup
-        del os.environ["PORT"]
-
 
 class TestHealthChecks:
     """Test health check endpoints"""
@@ -185,6 +491,33 @@ class TestHealthChecks:
         result = HealthCheck.check_database(str(db_path))
         assert result["status"] == "healthy"
 
+        result = HealthCheck.check_integrity(str(db_path))
+        assert result["status"] == "healthy"
+        assert result["repaired"] is False
+
+    def test_integrity_failure_not_cached(self, tmp_path, monkeypatch):
+        """Test a failed integrity check is re-run after the short failure TTL"""
+        import time
+
+        from orbcomm_tracker import monitoring
+        from orbcomm_tracker.monitoring import HealthCheck
+
+        db_path = tmp_path / "test.db"
+        db_path.write_bytes(b"not a database" * 100)
+        assert HealthCheck.check_integrity(str(db_path))["status"] == "unhealthy"
+
+        db_path.unlink()
+        Database(str(db_path)).close()
+
+        # Still inside DB_INTEGRITY_CHECK_INTERVAL, past the failure TTL
+        now = time.monotonic()
+        monkeypatch.setattr(
+            monitoring.time,
+            "monotonic",
+            lambda: now + monitoring.HEALTH_CACHE_TTL + 1,
+        )
+        assert HealthCheck.check_integrity(str(db_path))["status"] == "healthy"
+
     def test_disk_space_check(self, tmp_path):
         """Test disk space check"""
         from orbcomm_tracker.monitoring import HealthCheck
@@ -207,6 +540,8 @@ class TestSecurityFeatures:
 
     def test_password_hashing(self):
         """Test password hashing"""
+        import hashlib
+
         from orbcomm_tracker.security import SimpleAuth
 
         auth = SimpleAuth()
@@ -216,6 +551,7 @@ class TestSecurityFeatures:
         # Should be SHA256 hex (64 characters)
         assert len(hashed) == 64
         assert hashed != password
+        assert hashed == hashlib.sha256(password.encode()).hexdigest()
 
     def test_input_validation(self):
         """Test input validation"""
@@ -224,6 +560,7 @@ class TestSecurityFeatures:
         # Test email validation
         assert InputValidator.validate_email("test@example.com") is True
         assert InputValidator.validate_email("invalid-email") is False
+        assert InputValidator.validate_email("test@example.com\n") is False
 
         # Test date validation
         assert InputValidator.validate_date("2025-01-01") is True
@@ -241,20 +578,8 @@ class TestSecurityFeatures:
 
 
 @pytest.fixture
-def app():
+def app(flask_app):
     """Create Flask app for testing"""
-    import sys
-    from pathlib import Path
-
-    # Add project to path
-    sys.path.insert(0, str(Path(__file__).parent.parent))
-
-    # Import app
-    from orbcomm_dashboard import app as flask_app
-
-    flask_app.config["TESTING"] = True
-    flask_app.config["DATABASE_PATH"] = ":memory:"
-
     return flask_app
 
 
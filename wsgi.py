@@ -4,17 +4,21 @@ Production server configuration using Gunicorn
 """
 
 import os
-import sys
-from pathlib import Path
 
-# Add the project directory to the Python path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
+from dotenv import load_dotenv
 
-# Load environment variables from .env file
-from dotenv import load_dotenv  # noqa: E402
+# Load environment variables from .env file before config is imported,
+# unless gunicorn.conf.py already did so in the master process.
+# No sys.path setup needed: this file's directory, the project root, is
+# already importable for gunicorn (wsgi:application) and `python wsgi.py`.
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
-load_dotenv()
+# Development server settings, resolved once after .env is loaded
+_HOST = os.environ.get("HOST", "0.0.0.0")
+_PORT = int(os.environ.get("PORT", 5000))
+_DEBUG = os.environ.get("FLASK_ENV") == "development"
 
 # Import the Flask application
 from orbcomm_dashboard import app  # noqa: E402
@@ -25,8 +29,4 @@ application = app
 if __name__ == "__main__":
     # This block is used for development/debugging only
     # In production, use gunicorn to run this file
-    app.run(
-        host=os.environ.get("HOST", "0.0.0.0"),
-        port=int(os.environ.get("PORT", 5000)),
-        debug=os.environ.get("FLASK_ENV") == "development",
-    )
+    app.run(host=_HOST, port=_PORT, debug=_DEBUG)